@@ -18,6 +18,10 @@ load_dotenv()
 setup_logging(log_level="INFO", log_file="./logs/agent.log")
 logger = get_logger("example.conversational_agent")
 
+# Spare sandboxes kept booted for new sessions. A single-session run binds its
+# sandbox at startup, so by default none are kept (a spare would only idle).
+WARM_SANDBOXES = int(os.getenv("E2B_WARM_SANDBOXES", "0"))
+
 
 SYSTEM_PROMPT = """You are a helpful AI assistant with access to powerful tools:
 
@@ -56,7 +60,8 @@ async def run_conversation_agent():
     )
     
     e2b_provider = E2BProvider(
-        api_key=os.getenv("E2B_API_KEY")
+        api_key=os.getenv("E2B_API_KEY"),
+        min_warm=WARM_SANDBOXES
     )
     
     # Create tool executor
@@ -88,16 +93,16 @@ async def run_conversation_agent():
     # Session ID
     session_id = "demo-session-001"
     
-    # Create sandbox for session
-    logger.info(f"Creating E2B sandbox for session {session_id}")
-    e2b_provider.create_sandbox(session_id)
-    
-    print("\n" + "="*60)
-    print("CONVERSATIONAL AI AGENT")
-    print("="*60)
-    print("Type 'quit' to exit, 'reset' to clear history\n")
-    
     try:
+        # Boot the session's sandbox up front so the first tool call doesn't wait
+        logger.info(f"Creating E2B sandbox for session {session_id}")
+        await e2b_provider.acquire(session_id)
+        
+        print("\n" + "="*60)
+        print("CONVERSATIONAL AI AGENT")
+        print("="*60)
+        print("Type 'quit' to exit, 'reset' to clear history\n")
+        
         while True:
             # Get user input
             user_input = input("\n You: ").strip()
@@ -134,7 +139,8 @@ async def run_conversation_agent():
     finally:
         # Cleanup
         logger.info("Cleaning up...")
-        e2b_provider.close_sandbox(session_id)
+        await tool_executor.cancel_deferred()
+        await e2b_provider.cleanup_all_async()
         print("\n\n✓ Session ended")
 
 
@@ -145,7 +151,7 @@ async def run_example_tasks():
     
     # Initialize
     gemini_provider = GeminiProvider()
-    e2b_provider = E2BProvider()
+    e2b_provider = E2BProvider(min_warm=WARM_SANDBOXES)
     tool_executor = ToolExecutor(e2b_provider)
     memory_store = MemoryStore()
     
@@ -164,7 +170,6 @@ async def run_example_tasks():
     )
     
     session_id = "task-session-001"
-    e2b_provider.create_sandbox(session_id)
     
     # Example tasks
     tasks = [
@@ -178,6 +183,8 @@ async def run_example_tasks():
     print("="*60)
     
     try:
+        await e2b_provider.acquire(session_id)
+        
         for i, task in enumerate(tasks, 1):
             print(f"\n\n{'='*60}")
             print(f"TASK {i}: {task}")
@@ -194,7 +201,8 @@ async def run_example_tasks():
                 print(f"\n[Tools used: {len(response.tool_calls)}]")
     
     finally:
-        e2b_provider.close_sandbox(session_id)
+        await tool_executor.cancel_deferred()
+        await e2b_provider.cleanup_all_async()
         print("\n\n✓ All tasks completed")
 
 
@@ -2,7 +2,7 @@
 from typing import Dict, List, Any, Optional, AsyncIterator
 from dataclasses import dataclass, field
 from datetime import datetime
-import json
+import orjson
 
 from orchestrator.core.conversation import ConversationManager
 from orchestrator.core.memory import MemoryStore
@@ -26,7 +26,7 @@ class AgentConfig:
     timeout: int = 300
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentResponse:
     """Agent response."""
     content: str
@@ -59,11 +59,27 @@ class Agent:
         
         self.llm = llm_provider or GeminiProvider()
         self.tools = tool_executor
-        self.memory = memory_store or MemoryStore()
+        # The default directory can only be opened once, so agents share its store
+        self.memory = memory_store or MemoryStore.shared()
         self.conversation = ConversationManager(self.memory)
         
+        self._system_message: Optional[Dict] = None
+        if config.system_prompt:
+            self._system_message = {"role": "system", "content": config.system_prompt}
+        
+        # Tool schemas are static once tools are registered
+        self._tool_schemas: Optional[List[Dict]] = None
+        self.refresh_tools()
+        
         self.logger.info(f"Initialized agent: {config.name}")
     
+    def refresh_tools(self):
+        """Reload tool schemas from the executor (call after registering new tools)."""
+        if self.config.tools_enabled and self.tools:
+            self._tool_schemas = self.tools.get_tool_schemas()
+        else:
+            self._tool_schemas = None
+    
     @with_retry(max_attempts=3, exponential_backoff=True)
     async def run(
         self,
@@ -87,19 +103,13 @@ class Agent:
         messages = await self.conversation.get_messages(session_id)
         
         # Add system prompt
-        if self.config.system_prompt and not messages:
-            messages.insert(0, {
-                "role": "system",
-                "content": self.config.system_prompt
-            })
+        if self._system_message and not messages:
+            messages.append(self._system_message)
         
         # Add user message
         messages.append({"role": "user", "content": message})
         
-        # Get tools if enabled
-        tools = None
-        if self.config.tools_enabled and self.tools:
-            tools = self.tools.get_tool_schemas()
+        tools = self._tool_schemas
         
         # Execute agent loop
         iteration = 0
@@ -126,35 +136,32 @@ class Agent:
             if response.get("tool_calls"):
                 self.logger.info(f"Executing {len(response['tool_calls'])} tool calls")
                 
-                for tool_call in response["tool_calls"]:
-                    # Execute tool
-                    result = await self.tools.execute(
-                        session_id=session_id,
-                        tool_name=tool_call["function"]["name"],
-                        arguments=json.loads(tool_call["function"]["arguments"])
-                    )
-                    
-                    # Add tool result to messages
+                # Execute independent tool calls concurrently; deferred tools
+                # return handles the model collects later with await_tool
+                results = await self.tools.execute_many(session_id, [
+                    {
+                        "name": tool_call["function"]["name"],
+                        "arguments": orjson.loads(tool_call["function"]["arguments"])
+                    }
+                    for tool_call in response["tool_calls"]
+                ], allow_deferred=True)
+                
+                for tool_call, result in zip(response["tool_calls"], results):
+                    # Add tool results to messages in call order
                     messages.append({
                         "role": "tool",
                         "tool_call_id": tool_call["id"],
-                        "content": json.dumps(result)
+                        "content": orjson.dumps(result).decode()
                     })
             else:
                 # No more tool calls, done
                 break
         
         # Save conversation
-        await self.conversation.add_message(
-            session_id=session_id,
-            role="user",
-            content=message
-        )
-        await self.conversation.add_message(
-            session_id=session_id,
-            role="assistant",
-            content=response["content"]
-        )
+        await self.conversation.add_messages(session_id, [
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": response["content"]}
+        ])
         
         return AgentResponse(
             content=response["content"],
@@ -179,11 +186,8 @@ class Agent:
         """
         messages = await self.conversation.get_messages(session_id)
         
-        if self.config.system_prompt and not messages:
-            messages.insert(0, {
-                "role": "system",
-                "content": self.config.system_prompt
-            })
+        if self._system_message and not messages:
+            messages.append(self._system_message)
         
         messages.append({"role": "user", "content": message})
         
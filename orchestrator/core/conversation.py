@@ -1,21 +1,102 @@
 """Conversation management with history and context."""
-from typing import List, Dict, Optional
-from datetime import datetime
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Deque, List, Dict, Optional, Union
+from datetime import datetime, timezone
 from orchestrator.core.memory import MemoryStore
 
 
+def _to_ns(timestamp: Union[int, str]) -> int:
+    """Convert a stored timestamp (epoch ns, or ISO string from older history) to epoch ns."""
+    if isinstance(timestamp, int):
+        return timestamp
+    dt = datetime.fromisoformat(timestamp)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1_000_000_000)
+
+
+def _to_iso(timestamp: Union[int, str]) -> str:
+    """Format a stored timestamp as an ISO 8601 UTC string."""
+    return datetime.fromtimestamp(_to_ns(timestamp) / 1e9, tz=timezone.utc).isoformat()
+
+
 class ConversationManager:
     """Manages conversation history and context."""
     
-    def __init__(self, memory_store: MemoryStore, max_history: int = 50):
+    def __init__(
+        self,
+        memory_store: MemoryStore,
+        max_history: int = 50,
+        persist_every: int = 1,
+        max_sessions: int = 128
+    ):
         """Initialize conversation manager.
         
         Args:
             memory_store: Memory storage backend
             max_history: Maximum messages to keep per session
+            persist_every: Write history back to memory every N added messages
+            max_sessions: Sessions kept in the history cache (least recently
+                          used are flushed and evicted)
         """
         self.memory = memory_store
         self.max_history = max_history
+        self.persist_every = max(1, persist_every)
+        self.max_sessions = max(1, max_sessions)
+        # LRU cache of bounded session histories, written back to the memory store
+        self._cache: OrderedDict[str, Deque[Dict]] = OrderedDict()
+        self._unsaved: Dict[str, int] = {}
+        # Store version of each cached session when it was last loaded or saved
+        self._synced: Dict[str, int] = {}
+    
+    async def _history(self, session_id: str) -> Deque[Dict]:
+        """Get cached history for session, reloading it when the store has changed.
+        
+        A cached session is used without touching the store while its store
+        version is unchanged. Otherwise another writer (e.g. a manager sharing
+        the store) has changed it, so the cache is rebuilt from the store,
+        keeping any messages not yet flushed from here.
+        """
+        key = f"conversation:{session_id}"
+        history = self._cache.get(session_id)
+        
+        if history is not None and self.memory.version(key) == self._synced.get(session_id):
+            self._cache.move_to_end(session_id)
+            return history
+        
+        stored = await self.memory.get(key)
+        fresh = deque(stored or [], maxlen=self.max_history)
+        unsaved = self._unsaved.get(session_id, 0)
+        if history is not None and unsaved:
+            fresh.extend(islice(history, max(0, len(history) - unsaved), None))
+        
+        self._cache[session_id] = fresh
+        self._cache.move_to_end(session_id)
+        self._synced[session_id] = self.memory.version(key)
+        
+        while len(self._cache) > self.max_sessions:
+            oldest = next(iter(self._cache))
+            await self.flush(oldest)
+            del self._cache[oldest]
+            self._synced.pop(oldest, None)
+        
+        return fresh
+    
+    async def flush(self, session_id: Optional[str] = None):
+        """Write unsaved history back to the memory store.
+        
+        Args:
+            session_id: Session to flush (all sessions if omitted)
+        """
+        session_ids = [session_id] if session_id else list(self._unsaved)
+        
+        for sid in session_ids:
+            if self._unsaved.pop(sid, 0) and sid in self._cache:
+                key = f"conversation:{sid}"
+                await self.memory.set(key, list(self._cache[sid]))
+                self._synced[sid] = self.memory.version(key)
     
     async def get_messages(self, session_id: str) -> List[Dict]:
         """Get conversation messages for session.
@@ -26,10 +107,8 @@ class ConversationManager:
         Returns:
             List of messages in OpenAI format
         """
-        history = await self.memory.get(f"conversation:{session_id}", [])
-        
-        # Return last N messages
-        return history[-self.max_history:]
+        # Copy so callers can extend the list without touching the cache
+        return list(await self._history(session_id))
     
     async def add_message(
         self,
@@ -46,21 +125,37 @@ class ConversationManager:
             content: Message content
             metadata: Additional metadata
         """
-        message = {
+        await self.add_messages(session_id, [{
             "role": role,
             "content": content,
-            "timestamp": datetime.utcnow().isoformat(),
-            "metadata": metadata or {}
-        }
-        
-        history = await self.memory.get(f"conversation:{session_id}", [])
-        history.append(message)
-        
-        # Keep only recent messages
-        if len(history) > self.max_history:
-            history = history[-self.max_history:]
+            "metadata": metadata
+        }])
+    
+    async def add_messages(self, session_id: str, messages: List[Dict]):
+        """Add several messages to conversation with a single write.
         
-        await self.memory.set(f"conversation:{session_id}", history)
+        Args:
+            session_id: Session identifier
+            messages: Dicts with role, content and optional metadata
+        """
+        # Epoch nanoseconds; formatted lazily in get_summary
+        timestamp = time.time_ns()
+        
+        # Bounded deque drops the oldest messages once max_history is reached
+        history = await self._history(session_id)
+        history.extend(
+            {
+                "role": msg["role"],
+                "content": msg["content"],
+                "timestamp": timestamp,
+                "metadata": msg.get("metadata") or {}
+            }
+            for msg in messages
+        )
+        
+        self._unsaved[session_id] = self._unsaved.get(session_id, 0) + len(messages)
+        if self._unsaved[session_id] >= self.persist_every:
+            await self.flush(session_id)
     
     async def get_context(self, session_id: str, window: int = 5) -> str:
         """Get recent conversation context as string.
@@ -72,8 +167,11 @@ class ConversationManager:
         Returns:
             Formatted context string
         """
-        messages = await self.get_messages(session_id)
-        recent = messages[-window:]
+        history = await self._history(session_id)
+        
+        # Walk back only `window` messages instead of copying the whole history
+        recent = list(islice(reversed(history), window))
+        recent.reverse()
         
         context_parts = []
         for msg in recent:
@@ -85,6 +183,9 @@ class ConversationManager:
     
     async def clear_session(self, session_id: str):
         """Clear conversation history for session."""
+        self._cache.pop(session_id, None)
+        self._unsaved.pop(session_id, None)
+        self._synced.pop(session_id, None)
         await self.memory.delete(f"conversation:{session_id}")
     
     async def get_summary(self, session_id: str) -> Dict:
@@ -96,28 +197,36 @@ class ConversationManager:
         Returns:
             Summary dict with message counts, duration, etc.
         """
-        messages = await self.get_messages(session_id)
+        messages = await self._history(session_id)
         
         if not messages:
             return {"message_count": 0}
         
-        user_messages = [m for m in messages if m["role"] == "user"]
-        assistant_messages = [m for m in messages if m["role"] == "assistant"]
+        # Single pass over history for role counts
+        user_count = 0
+        assistant_count = 0
+        for msg in messages:
+            role = msg["role"]
+            if role == "user":
+                user_count += 1
+            elif role == "assistant":
+                assistant_count += 1
         
         first_msg = messages[0]
         last_msg = messages[-1]
         
+        first_ts = first_msg.get("timestamp")
+        last_ts = last_msg.get("timestamp")
+        
         duration = None
-        if "timestamp" in first_msg and "timestamp" in last_msg:
-            start = datetime.fromisoformat(first_msg["timestamp"])
-            end = datetime.fromisoformat(last_msg["timestamp"])
-            duration = (end - start).total_seconds()
+        if first_ts is not None and last_ts is not None:
+            duration = (_to_ns(last_ts) - _to_ns(first_ts)) / 1e9
         
         return {
             "message_count": len(messages),
-            "user_messages": len(user_messages),
-            "assistant_messages": len(assistant_messages),
+            "user_messages": user_count,
+            "assistant_messages": assistant_count,
             "duration_seconds": duration,
-            "first_message_at": first_msg.get("timestamp"),
-            "last_message_at": last_msg.get("timestamp")
+            "first_message_at": _to_iso(first_ts) if first_ts is not None else None,
+            "last_message_at": _to_iso(last_ts) if last_ts is not None else None
         }
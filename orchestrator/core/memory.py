@@ -1,26 +1,99 @@
 """Memory and context storage for agents."""
-import json
-from typing import Any, Optional, Dict
+import asyncio
+import atexit
+import heapq
+import mmap
+import os
+import re
+import time
+from typing import Any, Optional, Dict, List, Tuple
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+
+import orjson
+
+from orchestrator.utils.logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locking
+    fcntl = None
+
+# Newline-delimited records; keep stdlib json's tolerance for non-str keys
+_ORJSON_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+DEFAULT_STORAGE_DIR = "./storage/memory"
 
 
 class MemoryStore:
-    """In-memory store with optional file persistence."""
+    """In-memory store with optional file persistence.
     
-    def __init__(self, storage_dir: Optional[str] = "./storage/memory"):
+    Persistence is an append-only log of set/delete records, replayed on
+    startup and compacted into a snapshot once it grows past the live data.
+    """
+    
+    LOG_FILE = "memory.log"
+    LOCK_FILE = "memory.lock"
+    COMPACT_THRESHOLD = 1000
+    MAX_BATCH = 64
+    
+    # Stores handed out by shared(), by resolved storage directory
+    _shared: Dict[Path, "MemoryStore"] = {}
+    
+    def __init__(self, storage_dir: Optional[str] = DEFAULT_STORAGE_DIR):
         """Initialize memory store.
         
         Args:
             storage_dir: Directory for persistent storage
+            
+        Raises:
+            RuntimeError: If another MemoryStore already uses storage_dir
+                (use shared() to reuse it)
         """
         self.storage_dir = Path(storage_dir) if storage_dir else None
         self.cache: Dict[str, Any] = {}
-        self.ttl: Dict[str, datetime] = {}
+        # Expiry deadlines as time.monotonic_ns() values
+        self.ttl: Dict[str, int] = {}
+        # Min-heap of (deadline, key); entries go stale when a key's TTL changes
+        self._ttl_heap: List[Tuple[int, str]] = []
+        # Write counter value of each key's last set(); see version()
+        self._versions: Dict[str, int] = {}
+        self._write_count = 0
+        self._log = None
+        self._lock_file = None
+        self._log_records = 0
+        # Records waiting to be written in one batch
+        self._pending: List[bytes] = []
+        self._flush_scheduled = False
+        # Log size below which automatic compaction is not retried after a failure
+        self._compact_after = 0
+        self.logger = get_logger("core.memory")
         
         if self.storage_dir:
             self.storage_dir.mkdir(parents=True, exist_ok=True)
+            self._lock_storage_dir()
             self._load_from_disk()
+            # Don't lose records queued right before interpreter exit
+            atexit.register(self.flush)
+    
+    @classmethod
+    def shared(cls, storage_dir: str = DEFAULT_STORAGE_DIR) -> "MemoryStore":
+        """Get the process-wide store for a directory, opening it on first use.
+        
+        Only one MemoryStore can hold a storage directory at a time, so
+        components that default to the same directory should share this one.
+        
+        Args:
+            storage_dir: Directory for persistent storage
+            
+        Returns:
+            Open MemoryStore for storage_dir
+        """
+        key = Path(storage_dir).resolve()
+        store = cls._shared.get(key)
+        if store is None or store._log is None:
+            store = cls._shared[key] = cls(storage_dir)
+        return store
     
     async def get(self, key: str, default: Any = None) -> Any:
         """Get value from memory.
@@ -33,7 +106,8 @@ class MemoryStore:
             Stored value or default
         """
         # Check TTL
-        if key in self.ttl and datetime.utcnow() > self.ttl[key]:
+        deadline = self.ttl.get(key)
+        if deadline is not None and time.monotonic_ns() > deadline:
             await self.delete(key)
             return default
         
@@ -53,9 +127,15 @@ class MemoryStore:
             ttl_seconds: Time to live in seconds
         """
         self.cache[key] = value
+        self._write_count += 1
+        self._versions[key] = self._write_count
         
         if ttl_seconds:
-            self.ttl[key] = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+            deadline = time.monotonic_ns() + int(ttl_seconds * 1_000_000_000)
+            self.ttl[key] = deadline
+            heapq.heappush(self._ttl_heap, (deadline, key))
+        
+        await self.sweep_expired()
         
         if self.storage_dir:
             await self._persist_to_disk(key, value)
@@ -64,16 +144,30 @@ class MemoryStore:
         """Delete value from memory."""
         self.cache.pop(key, None)
         self.ttl.pop(key, None)
+        self._versions.pop(key, None)
         
         if self.storage_dir:
-            file_path = self.storage_dir / f"{self._safe_key(key)}.json"
-            if file_path.exists():
-                file_path.unlink()
+            self._append({"k": key, "d": 1})
+    
+    def version(self, key: str) -> int:
+        """Get a token that changes whenever key is set or deleted.
+        
+        Lets callers that cache a value check it is still current without
+        fetching it again. Missing keys are -1; keys loaded from disk and not
+        written since are 0.
+        """
+        if key not in self.cache:
+            return -1
+        return self._versions.get(key, 0)
     
     async def exists(self, key: str) -> bool:
-        """Check if key exists."""
-        value = await self.get(key)
-        return value is not None
+        """Check if key exists (a stored None counts as existing)."""
+        deadline = self.ttl.get(key)
+        if deadline is not None and time.monotonic_ns() > deadline:
+            await self.delete(key)
+            return False
+        
+        return key in self.cache
     
     async def keys(self, pattern: Optional[str] = None) -> list:
         """Get all keys, optionally filtered by pattern.
@@ -84,6 +178,8 @@ class MemoryStore:
         Returns:
             List of matching keys
         """
+        await self.sweep_expired()
+        
         keys = list(self.cache.keys())
         
         if pattern:
@@ -95,43 +191,222 @@ class MemoryStore:
         """Clear all memory."""
         self.cache.clear()
         self.ttl.clear()
+        self._ttl_heap.clear()
+        self._versions.clear()
         
-        if self.storage_dir:
-            for file in self.storage_dir.glob("*.json"):
-                file.unlink()
+        self._pending.clear()
+        if self._log:
+            self._log.truncate(0)
+            self._log_records = 0
+    
+    async def sweep_expired(self) -> int:
+        """Evict every key whose TTL has passed.
+        
+        Returns:
+            Number of keys evicted
+        """
+        now = time.monotonic_ns()
+        evicted = 0
+        
+        while self._ttl_heap and self._ttl_heap[0][0] <= now:
+            deadline, key = heapq.heappop(self._ttl_heap)
+            # Skip stale entries left behind by a later set() or delete()
+            if self.ttl.get(key) == deadline:
+                await self.delete(key)
+                evicted += 1
+        
+        return evicted
+    
+    def compact(self):
+        """Rewrite the log as a snapshot holding one record per live key.
+        
+        Pending records are only dropped once the snapshot has replaced the
+        log; if encoding or writing fails they stay queued and the error is
+        raised.
+        """
+        if not self._log:
+            return
+        
+        log_path = self.storage_dir / self.LOG_FILE
+        tmp_path = log_path.with_suffix(".tmp")
+        
+        try:
+            with open(tmp_path, "wb") as f:
+                f.writelines(self._encode({"k": k, "v": v}) for k, v in self.cache.items())
+                # The snapshot must be on disk before it replaces the log
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        self._log.close()
+        try:
+            os.replace(tmp_path, log_path)
+            self._fsync_dir()
+        finally:
+            self._log = open(log_path, "ab")
+        
+        # Pending records are superseded by the snapshot of the cache
+        self._pending.clear()
+        self._log_records = len(self.cache)
+    
+    def flush(self):
+        """Write all pending log records in a single call."""
+        self._flush_scheduled = False
+        
+        if not self._pending or not self._log:
+            return
+        
+        self._log.write(b"".join(self._pending))
+        self._log.flush()
+        self._pending.clear()
+    
+    def close(self):
+        """Flush pending records, close the persistence log and release the directory."""
+        if self._log:
+            self.flush()
+            self._log.close()
+            self._log = None
+        
+        if self._lock_file:
+            self._lock_file.close()  # Closing drops the flock
+            self._lock_file = None
+    
+    def _fsync_dir(self):
+        """Make the storage directory's entries (e.g. a rename) durable."""
+        try:
+            fd = os.open(self.storage_dir, os.O_RDONLY)
+        except OSError:
+            return  # Directories can't be opened on Windows
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
     
-    def _safe_key(self, key: str) -> str:
-        """Convert key to safe filename."""
-        return key.replace(":", "_").replace("/", "_").replace(" ", "_")
+    def _lock_storage_dir(self):
+        """Claim the storage directory for this store.
+        
+        Compaction replaces the log file, so a second store appending to the
+        same directory would write to the unlinked old file and lose data.
+        
+        Raises:
+            RuntimeError: If another MemoryStore already uses the directory
+        """
+        if fcntl is None:
+            return
+        
+        self._lock_file = open(self.storage_dir / self.LOCK_FILE, "wb")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            raise RuntimeError(
+                f"Storage directory {self.storage_dir} is in use by another MemoryStore"
+            )
     
     def _load_from_disk(self):
-        """Load persisted memory from disk."""
+        """Replay the persistence log and migrate legacy per-key files."""
         if not self.storage_dir:
             return
         
-        for file in self.storage_dir.glob("*.json"):
+        log_path = self.storage_dir / self.LOG_FILE
+        
+        if log_path.exists() and log_path.stat().st_size:
+            with open(log_path, "r+b") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Anything after the last newline is a torn final write
+                    end = mm.rfind(b"\n") + 1
+                    while mm.tell() < end:
+                        try:
+                            record = orjson.loads(mm.readline())
+                            if "d" in record:
+                                self.cache.pop(record["k"], None)
+                            else:
+                                self.cache[record["k"]] = record["v"]
+                        except (ValueError, KeyError, TypeError):
+                            continue  # Skip corrupted or malformed records
+                        self._log_records += 1
+                    size = len(mm)
+                
+                # Cut the torn tail so the next append starts on a fresh line
+                if end < size:
+                    f.truncate(end)
+        
+        # Older versions stored one JSON file per key
+        legacy_files = list(self.storage_dir.glob("*.json"))
+        for file in legacy_files:
             try:
-                with open(file, 'r') as f:
-                    data = json.load(f)
+                with open(file, 'rb') as f:
+                    data = orjson.loads(f.read())
                     # Restore original key from filename
                     key = file.stem.replace("_", ":")
-                    self.cache[key] = data
+                    self.cache.setdefault(key, data)
             except Exception:
                 pass  # Skip corrupted files
+        
+        self._log = open(log_path, "ab")
+        
+        if legacy_files:
+            self.compact()
+            for file in legacy_files:
+                file.unlink()
     
     async def _persist_to_disk(self, key: str, value: Any):
         """Persist value to disk."""
         if not self.storage_dir:
             return
         
-        file_path = self.storage_dir / f"{self._safe_key(key)}.json"
-        
         try:
-            with open(file_path, 'w') as f:
-                json.dump(value, f, indent=2, default=str)
+            self._append({"k": key, "v": value})
         except Exception as e:
             # Log error but don't fail
             print(f"Failed to persist {key}: {e}")
+    
+    def _append(self, record: Dict):
+        """Queue one record for the log, compacting when it outgrows live data.
+        
+        Records queued during the same event loop iteration are written
+        together; outside a running loop each record is written immediately.
+        """
+        self._pending.append(self._encode(record))
+        self._log_records += 1
+        
+        limit = max(self.COMPACT_THRESHOLD, 2 * len(self.cache), self._compact_after)
+        if self._log_records > limit:
+            try:
+                self.compact()
+                return
+            except Exception as e:
+                # Keep appending; retry once the log has grown by another threshold
+                self.logger.error(f"Memory log compaction failed: {e}")
+                self._compact_after = self._log_records + self.COMPACT_THRESHOLD
+        
+        if len(self._pending) >= self.MAX_BATCH:
+            self.flush()
+            return
+        
+        if not self._flush_scheduled:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+                return
+            loop.call_soon(self._scheduled_flush)
+            self._flush_scheduled = True
+    
+    def _scheduled_flush(self):
+        """Flush from the event loop, logging failures instead of losing them."""
+        try:
+            self.flush()
+        except Exception as e:
+            self.logger.error(f"Failed to flush memory log: {e}")
+    
+    @staticmethod
+    def _encode(record: Dict) -> bytes:
+        """Encode a log record as one newline-terminated JSON line."""
+        return orjson.dumps(record, default=str, option=_ORJSON_OPTIONS)
 
 
 class VectorMemory:
@@ -139,27 +414,51 @@ class VectorMemory:
     
     def __init__(self):
         """Initialize vector memory."""
-        self.documents = []
+        # Parallel columns, one entry per document
+        self.texts: List[str] = []
+        self._lower_texts: List[str] = []
+        self.metadata: List[Dict] = []
+        self.timestamps: List[int] = []  # Epoch nanoseconds
+    
+    @property
+    def documents(self) -> list:
+        """All documents as dicts."""
+        return [self._document(i) for i in range(len(self.texts))]
     
     async def add(self, text: str, metadata: Optional[Dict] = None):
         """Add document to vector memory."""
-        self.documents.append({
-            "text": text,
-            "metadata": metadata or {},
-            "timestamp": datetime.utcnow().isoformat()
-        })
+        self.texts.append(text)
+        self._lower_texts.append(text.lower())
+        self.metadata.append(metadata or {})
+        self.timestamps.append(time.time_ns())
     
     async def search(self, query: str, limit: int = 5) -> list:
         """Search for similar documents.
         
         Note: This is a placeholder. In production, use embeddings.
         """
-        # Simple keyword search for now
+        words = query.lower().split()
+        if not words:
+            return []
+        
+        # Simple keyword search for now - one regex pass matches any query word
+        pattern = re.compile("|".join(re.escape(word) for word in words))
+        
         results = []
-        for doc in self.documents:
-            if any(word.lower() in doc["text"].lower() for word in query.split()):
-                results.append(doc)
+        for i, lower_text in enumerate(self._lower_texts):
+            if pattern.search(lower_text):
+                results.append(self._document(i))
                 if len(results) >= limit:
                     break
         
         return results
+    
+    def _document(self, index: int) -> Dict:
+        """Build the document dict for one row."""
+        return {
+            "text": self.texts[index],
+            "metadata": self.metadata[index],
+            "timestamp": datetime.fromtimestamp(
+                self.timestamps[index] / 1e9, tz=timezone.utc
+            ).isoformat()
+        }
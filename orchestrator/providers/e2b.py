@@ -1,6 +1,11 @@
 """E2B provider for code execution."""
+import asyncio
 import os
-from typing import Optional, Dict, Any
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Dict, Any, Deque, List, Tuple, Union
 from e2b_code_interpreter import Sandbox
 
 from orchestrator.utils.logging import get_logger
@@ -10,23 +15,57 @@ from orchestrator.utils.retry import with_retry
 class E2BProvider:
     """E2B sandbox provider."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        min_warm: int = 0,
+        max_idle_sec: float = 240,
+        sandbox_timeout: int = 300
+    ):
         """Initialize E2B provider.
         
         Args:
             api_key: E2B API key (or use E2B_API_KEY env var)
+            min_warm: Warm sandboxes to keep ready per template after acquire()
+            max_idle_sec: Discard warm sandboxes idle longer than this
+                          (must be below sandbox_timeout)
+            sandbox_timeout: Sandbox lifetime in seconds; a warm sandbox gets
+                             a fresh full timeout when handed to a session
         """
+        if max_idle_sec >= sandbox_timeout:
+            raise ValueError("max_idle_sec must be below sandbox_timeout")
+        
         self.api_key = api_key or os.getenv("E2B_API_KEY")
         self.logger = get_logger("provider.e2b")
         self.sandboxes: Dict[str, Sandbox] = {}
+        self.min_warm = min_warm
+        self.max_idle_sec = max_idle_sec
+        self.sandbox_timeout = sandbox_timeout
+        # Pre-created, never-used (created_at, sandbox) pairs keyed by template
+        self._pool: Dict[str, Deque[Tuple[float, Sandbox]]] = {}
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+        self._refills: Dict[str, asyncio.Task] = {}
+        # Called with the sandbox ID whenever a session sandbox is closed
+        self._close_listeners: List[Callable[[str], None]] = []
+        # Creations in flight per template, counted against the pool size
+        self._warming: Dict[str, int] = {}
+        # Guards _pool and _warming against creations finishing in worker
+        # threads; once _closed is set, late sandboxes are killed instead of pooled
+        self._pool_lock = threading.Lock()
+        self._closed = False
     
     # Custom template with pre-installed packages (numpy, pandas, sklearn, matplotlib)
     DEFAULT_TEMPLATE = "en7sb4k1n268scs49jnj"
     
+    # Upper bound on idle warm sandboxes kept per template
+    MAX_IDLE = 8
+    
     @with_retry(max_attempts=2)
     def create_sandbox(self, session_id: str, template: Optional[str] = None) -> str:
         """Create E2B sandbox.
         
+        Hands out a warm sandbox from the pool when one is available.
+        
         Args:
             session_id: Session identifier
             template: E2B template ID (optional, uses custom template with pre-installed packages)
@@ -37,23 +76,182 @@ class E2BProvider:
         """
         self.logger.info(f"Creating sandbox for session {session_id}")
         
-        # Use custom template by default (has numpy, pandas, sklearn, matplotlib pre-installed)
-        if template == "default":
-            self.logger.info("Using default E2B template (no pre-installed packages)")
-            sandbox = Sandbox(api_key=self.api_key)
+        template = template or self.DEFAULT_TEMPLATE
+        sandbox = self._pop_warm(template)
+        
+        if sandbox:
+            self.logger.info(f"Using warm sandbox from pool: {sandbox.sandbox_id}")
         else:
-            template = template or self.DEFAULT_TEMPLATE
-            self.logger.info(f"Using custom template: {template}")
-            sandbox = Sandbox(
-                template=template,
-                api_key=self.api_key
-            )
+            sandbox = self._new_sandbox(template)
         
         self.sandboxes[session_id] = sandbox
         self.logger.info(f"Sandbox created: {sandbox.sandbox_id}")
         
         return sandbox.sandbox_id
     
+    def prewarm(self, count: int, template: Optional[str] = None) -> int:
+        """Pre-create idle sandboxes so later sessions skip cold start.
+        
+        Args:
+            count: Number of sandboxes to keep warm for the template
+            template: E2B template ID (same semantics as create_sandbox)
+            
+        Returns:
+            Number of warm sandboxes available for the template
+        """
+        template = template or self.DEFAULT_TEMPLATE
+        
+        while self._reserve(template, count, at_most=1):
+            self._warm_one(template)
+        
+        self.logger.info(f"Warm pool for {template}: {self._pool_size(template)} sandbox(es)")
+        return self._pool_size(template)
+    
+    async def prewarm_async(self, count: int, template: Optional[str] = None) -> int:
+        """Pre-create idle sandboxes concurrently (see prewarm).
+        
+        Args:
+            count: Number of sandboxes to keep warm for the template
+            template: E2B template ID (same semantics as create_sandbox)
+            
+        Returns:
+            Number of warm sandboxes available for the template
+        """
+        template = template or self.DEFAULT_TEMPLATE
+        missing = self._reserve(template, count)
+        
+        if missing:
+            results = await asyncio.gather(
+                *(asyncio.to_thread(self._warm_one, template) for _ in range(missing)),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    self.logger.warning(f"Failed to pre-warm sandbox: {result}")
+        
+        self.logger.info(f"Warm pool for {template}: {self._pool_size(template)} sandbox(es)")
+        return self._pool_size(template)
+    
+    def _pool_size(self, template: str) -> int:
+        """Number of idle warm sandboxes for template."""
+        return len(self._pool.get(template, ()))
+    
+    def _reserve(self, template: str, count: int, at_most: Optional[int] = None) -> int:
+        """Claim pool slots for new warm sandboxes, up to count (capped at MAX_IDLE).
+        
+        Reserving under the lock keeps concurrent prewarms and refills from
+        overfilling the pool. Each reserved slot must be released by _warm_one.
+        
+        Returns:
+            Number of sandboxes the caller should create
+        """
+        with self._pool_lock:
+            if self._closed:
+                return 0
+            warming = self._warming.get(template, 0)
+            missing = min(count, self.MAX_IDLE) - self._pool_size(template) - warming
+            if at_most is not None:
+                missing = min(missing, at_most)
+            if missing <= 0:
+                return 0
+            self._warming[template] = warming + missing
+            return missing
+    
+    def _warm_one(self, template: str):
+        """Create one sandbox for a reserved slot and add it to the warm pool.
+        
+        The pool update happens in the creating thread, so a creation that
+        outlives its (cancelled) refill task is still accounted for: after
+        the provider is closed the sandbox is killed rather than pooled.
+        """
+        sandbox = None
+        try:
+            sandbox = self._new_sandbox(template)
+        finally:
+            with self._pool_lock:
+                self._warming[template] -= 1
+                if sandbox is not None and not self._closed:
+                    self._pool.setdefault(template, deque()).append((time.monotonic(), sandbox))
+                    sandbox = None
+        
+        if sandbox is not None:
+            self._kill_idle(sandbox)
+    
+    async def acquire(self, session_id: str, template: Optional[str] = None) -> Sandbox:
+        """Get the session's sandbox, binding a warm one on first use.
+        
+        Concurrent calls for the same session share a single sandbox. When
+        min_warm is set, the pool is refilled in the background.
+        
+        Args:
+            session_id: Session identifier
+            template: E2B template ID (same semantics as create_sandbox)
+            
+        Returns:
+            Sandbox bound to the session
+        """
+        sandbox = self.sandboxes.get(session_id)
+        if sandbox:
+            return sandbox
+        
+        lock = self._session_locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            if session_id not in self.sandboxes:
+                await self.create_sandbox_async(session_id, template)
+        
+        self._schedule_refill(template or self.DEFAULT_TEMPLATE)
+        return self.sandboxes[session_id]
+    
+    def _schedule_refill(self, template: str):
+        """Top the warm pool back up to min_warm in a background task."""
+        if not self.min_warm or self._closed:
+            return
+        
+        task = self._refills.get(template)
+        if task and not task.done():
+            return
+        
+        self._refills[template] = asyncio.create_task(
+            self.prewarm_async(self.min_warm, template)
+        )
+    
+    def _pop_warm(self, template: str) -> Optional[Sandbox]:
+        """Take a fresh warm sandbox for template, dropping ones idle too long.
+        
+        The E2B timeout counts from creation, so the sandbox's timeout is
+        reset to the full sandbox_timeout before it is handed out.
+        """
+        pool = self._pool.get(template)
+        
+        while pool:
+            with self._pool_lock:
+                if not pool:
+                    break
+                created_at, sandbox = pool.popleft()
+            if time.monotonic() - created_at < self.max_idle_sec:
+                try:
+                    sandbox.set_timeout(self.sandbox_timeout)
+                    return sandbox
+                except Exception as e:
+                    self.logger.warning(f"Dropping warm sandbox {sandbox.sandbox_id}: {e}")
+            self._kill_idle(sandbox)
+        
+        return None
+    
+    def _new_sandbox(self, template: str) -> Sandbox:
+        """Start a fresh sandbox from template."""
+        # Use custom template by default (has numpy, pandas, sklearn, matplotlib pre-installed)
+        if template == "default":
+            self.logger.info("Using default E2B template (no pre-installed packages)")
+            return Sandbox(api_key=self.api_key, timeout=self.sandbox_timeout)
+        
+        self.logger.info(f"Using custom template: {template}")
+        return Sandbox(
+            template=template,
+            api_key=self.api_key,
+            timeout=self.sandbox_timeout
+        )
+    
     def get_sandbox(self, session_id: str) -> Optional[Sandbox]:
         """Get existing sandbox."""
         return self.sandboxes.get(session_id)
@@ -118,12 +316,27 @@ class E2BProvider:
     def read_file(
         self,
         session_id: str,
-        path: str
-    ) -> bytes:
-        """Read file from sandbox."""
+        path: str,
+        binary: bool = False
+    ) -> Union[str, bytes]:
+        """Read file from sandbox.
+        
+        Args:
+            session_id: Session identifier
+            path: File path in the sandbox
+            binary: Return raw bytes instead of decoded text
+            
+        Returns:
+            File content as text, or bytes when binary is set
+            
+        Raises:
+            UnicodeDecodeError: If text is requested and the file isn't UTF-8
+        """
         sandbox = self.get_sandbox(session_id)
         if sandbox:
-            return sandbox.files.read(path)
+            # Always fetch raw bytes; the SDK's text mode silently replaces bad bytes
+            data = bytes(sandbox.files.read(path, format="bytes"))
+            return data if binary else data.decode("utf-8")
         raise ValueError(f"No sandbox for session {session_id}")
     
     def list_files(
@@ -138,17 +351,120 @@ class E2BProvider:
             return [f.name for f in files]
         return []
     
+    def add_close_listener(self, callback: Callable[[str], None]):
+        """Register callback(sandbox_id) to run when a session sandbox is closed.
+        
+        Lets tools drop per-sandbox state (e.g. kernel setup) for dead sandboxes.
+        """
+        self._close_listeners.append(callback)
+    
     def close_sandbox(self, session_id: str):
         """Close sandbox."""
+        self._session_locks.pop(session_id, None)
         sandbox = self.sandboxes.pop(session_id, None)
         if sandbox:
+            for callback in self._close_listeners:
+                callback(sandbox.sandbox_id)
             try:
                 sandbox.kill()
                 self.logger.info(f"Closed sandbox for session {session_id}")
             except Exception as e:
                 self.logger.warning(f"Error closing sandbox {session_id}: {e}")
     
+    # Async variants run the blocking SDK calls in worker threads
+    
+    async def create_sandbox_async(self, session_id: str, template: Optional[str] = None) -> str:
+        """Create E2B sandbox without blocking the event loop."""
+        return await asyncio.to_thread(self.create_sandbox, session_id, template)
+    
+    async def execute_code_async(
+        self,
+        session_id: str,
+        code: str,
+        language: str = "python"
+    ) -> Dict[str, Any]:
+        """Execute code in sandbox without blocking the event loop."""
+        return await asyncio.to_thread(self.execute_code, session_id, code, language)
+    
+    async def execute_many(self, jobs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Execute code in several sandboxes concurrently.
+        
+        Args:
+            jobs: (session_id, code) pairs
+            
+        Returns:
+            Execution results in input order
+        """
+        return await asyncio.gather(*(
+            self.execute_code_async(session_id, code) for session_id, code in jobs
+        ))
+    
+    async def write_file_async(self, session_id: str, path: str, content: bytes):
+        """Write file to sandbox without blocking the event loop."""
+        await asyncio.to_thread(self.write_file, session_id, path, content)
+    
+    async def read_file_async(
+        self,
+        session_id: str,
+        path: str,
+        binary: bool = False
+    ) -> Union[str, bytes]:
+        """Read file from sandbox without blocking the event loop."""
+        return await asyncio.to_thread(self.read_file, session_id, path, binary)
+    
+    async def list_files_async(self, session_id: str, directory: str = "/") -> list:
+        """List files in sandbox directory without blocking the event loop."""
+        return await asyncio.to_thread(self.list_files, session_id, directory)
+    
+    async def close_sandbox_async(self, session_id: str):
+        """Close sandbox without blocking the event loop."""
+        await asyncio.to_thread(self.close_sandbox, session_id)
+    
     def cleanup_all(self):
-        """Close all sandboxes."""
-        for session_id in list(self.sandboxes.keys()):
-            self.close_sandbox(session_id)
+        """Close all sandboxes, including idle ones in the warm pool.
+        
+        Kills run concurrently, so N sandboxes close in about one round-trip.
+        """
+        session_ids = list(self.sandboxes.keys())
+        idle = self._drain_pool()
+        
+        if not session_ids and not idle:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(32, len(session_ids) + len(idle))) as pool:
+            for session_id in session_ids:
+                pool.submit(self.close_sandbox, session_id)
+            for sandbox in idle:
+                pool.submit(self._kill_idle, sandbox)
+    
+    async def cleanup_all_async(self):
+        """Close all sandboxes concurrently without blocking the event loop."""
+        await asyncio.gather(
+            *(self.close_sandbox_async(sid) for sid in list(self.sandboxes)),
+            *(asyncio.to_thread(self._kill_idle, sb) for sb in self._drain_pool())
+        )
+    
+    def _drain_pool(self) -> List[Sandbox]:
+        """Close the warm pool, then remove and return every idle sandbox.
+        
+        Creations still running in worker threads kill their sandbox when
+        they finish (see _warm_one), and the pool is not refilled again.
+        """
+        for task in self._refills.values():
+            task.cancel()
+        self._refills.clear()
+        
+        idle = []
+        with self._pool_lock:
+            self._closed = True
+            for pool in self._pool.values():
+                idle.extend(sandbox for _, sandbox in pool)
+                pool.clear()
+        return idle
+    
+    def _kill_idle(self, sandbox: Sandbox):
+        """Kill an idle pooled sandbox, logging failures."""
+        try:
+            sandbox.kill()
+        except Exception as e:
+            self.logger.warning(f"Error closing warm sandbox {sandbox.sandbox_id}: {e}")
@@ -1,9 +1,10 @@
 """Google Gemini provider for AI agent system."""
+import hashlib
 import os
 from typing import List, Dict, Optional, AsyncIterator
 from google import genai
 from google.genai.types import GenerateContentConfig, Tool, FunctionDeclaration
-import json
+import orjson
 
 from orchestrator.utils.logging import get_logger
 from orchestrator.utils.retry import with_retry
@@ -12,16 +13,24 @@ from orchestrator.utils.retry import with_retry
 class GeminiProvider:
     """Production Gemini provider with async support."""
     
-    def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        client: Optional[genai.Client] = None
+    ):
         """Initialize Gemini client.
         
         Args:
             api_key: Gemini API key (or use GEMINI_API_KEY env var)
             model: Gemini model name (or use GEMINI_MODEL env var)
+            client: Existing genai client to share its connection pool
         """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         self.model = model or os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
-        self.client = genai.Client(api_key=self.api_key)
+        self.client = client or genai.Client(api_key=self.api_key)
+        # Converted Tool objects keyed by a digest of the tool schemas
+        self._tools_cache: Dict[bytes, Optional[Tool]] = {}
         self.logger = get_logger("provider.gemini")
         self.logger.info(f"Initialized Gemini with model: {self.model}")
     
@@ -56,7 +65,7 @@ class GeminiProvider:
         # Convert tools to Gemini format
         gemini_tools = None
         if tools:
-            gemini_tools = [self._convert_tools(tools)]
+            gemini_tools = [self._cached_tools(tools)]
         
         # Setup generation config
         config_params = {
@@ -88,24 +97,28 @@ class GeminiProvider:
                 }
             }
             
-            # Extract content
-            if response.text:
-                result["content"] = response.text
-            
-            # Extract function calls
-            if response.candidates:
-                for candidate in response.candidates:
-                    if candidate.content and candidate.content.parts:
-                        for part in candidate.content.parts:
-                            if part.function_call:
-                                fc = part.function_call
-                                result["tool_calls"].append({
-                                    "id": f"call_{hash(fc.name)}",
-                                    "function": {
-                                        "name": fc.name,
-                                        "arguments": json.dumps(dict(fc.args))
-                                    }
-                                })
+            # Extract text and function calls in one pass over the parts
+            parts = []
+            if response.candidates and response.candidates[0].content:
+                parts = response.candidates[0].content.parts or []
+            
+            text_parts = []
+            for part in parts:
+                if part.function_call:
+                    fc = part.function_call
+                    # Position within the response; stable across runs
+                    result["tool_calls"].append({
+                        "id": f"call_{len(result['tool_calls'])}",
+                        "function": {
+                            "name": fc.name,
+                            # google-genai already exposes args as a dict
+                            "arguments": orjson.dumps(fc.args or {}).decode()
+                        }
+                    })
+                elif part.text and not getattr(part, "thought", False):
+                    text_parts.append(part.text)
+            
+            result["content"] = "".join(text_parts)
             
             if result["tool_calls"]:
                 self.logger.info(f"Tool calls: {len(result['tool_calls'])}")
@@ -188,6 +201,25 @@ class GeminiProvider:
         
         return gemini_messages
     
+    def _cached_tools(self, tools: List[Dict]) -> Optional[Tool]:
+        """Convert tools once per distinct schema list.
+        
+        Args:
+            tools: OpenAI format tools
+            
+        Returns:
+            Gemini format Tool object
+        """
+        key = hashlib.blake2b(
+            orjson.dumps(tools, option=orjson.OPT_SORT_KEYS),
+            digest_size=16
+        ).digest()
+        
+        if key not in self._tools_cache:
+            self._tools_cache[key] = self._convert_tools(tools)
+        
+        return self._tools_cache[key]
+    
     def _convert_tools(self, tools: List[Dict]) -> List:
         """Convert OpenAI tools format to Gemini format.
         
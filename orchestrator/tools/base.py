@@ -1,6 +1,6 @@
 """Base tool interface."""
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import ClassVar, Dict, Any, Optional
 from dataclasses import dataclass
 
 
@@ -13,18 +13,66 @@ class ToolDefinition:
     examples: Optional[list] = None
 
 
+def function_schema(name: str, description: str, parameters: Dict) -> Dict:
+    """Build a function calling schema.
+    
+    Args:
+        name: Tool name
+        description: Tool description
+        parameters: JSON schema for the tool arguments
+        
+    Returns:
+        Tool schema for function calling
+    """
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": parameters
+        }
+    }
+
+
 class BaseTool(ABC):
-    """Base class for all tools."""
+    """Base class for all tools.
+    
+    Subclasses may declare name, description and SCHEMA at class level so
+    every instance shares one copy. Tools with deferred set run in the
+    background when the caller allows it, and hand back a handle instead.
+    """
+    
+    name: str
+    description: str
+    SCHEMA: ClassVar[Optional[Dict]] = None
+    deferred: ClassVar[bool] = False
+    _schema: Optional[Dict] = None
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Intermediate bases that leave execute abstract need no schema yet
+        if getattr(cls.execute, "__isabstractmethod__", False):
+            return
+        if cls.SCHEMA is None and cls.get_schema is BaseTool.get_schema:
+            raise TypeError(f"{cls.__name__} must define SCHEMA or get_schema()")
     
-    def __init__(self, name: str, description: str):
+    def __init__(self, name: Optional[str] = None, description: Optional[str] = None):
         """Initialize tool.
         
         Args:
-            name: Tool name
-            description: Tool description
+            name: Tool name (overrides the class-level name)
+            description: Tool description (overrides the class-level description)
         """
-        self.name = name
-        self.description = description
+        if name is not None:
+            self.name = name
+        if description is not None:
+            self.description = description
+        
+        # Overrides need their own schema; otherwise the shared SCHEMA is used
+        if (name is not None or description is not None) and self.SCHEMA:
+            self._schema = function_schema(
+                self.name, self.description, self.SCHEMA["function"]["parameters"]
+            )
     
     @abstractmethod
     async def execute(self, **kwargs) -> Dict[str, Any]:
@@ -35,14 +83,13 @@ class BaseTool(ABC):
         """
         pass
     
-    @abstractmethod
     def get_schema(self) -> Dict:
         """Get Gemini function calling schema.
         
         Returns:
-            Tool schema for function calling
+            Tool schema for function calling (may be shared; do not mutate)
         """
-        pass
+        return self._schema or self.SCHEMA
     
     def validate_args(self, args: Dict) -> bool:
         """Validate tool arguments."""
@@ -1,15 +1,30 @@
 """Tool executor with E2B integration."""
-from typing import Dict, Any, List
+import asyncio
+import functools
+import secrets
+from collections import OrderedDict
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+from orchestrator.tools.base import BaseTool
 from orchestrator.tools.registry import ToolRegistry
 from orchestrator.tools.implementations import (
     CodeExecutionTool,
     FileOperationsTool,
     WebSearchTool,
-    DataAnalysisTool
+    DataAnalysisTool,
+    AwaitToolTool
 )
 from orchestrator.providers.e2b import E2BProvider
 from orchestrator.utils.logging import get_logger
 
+# Default cap on tools running at once in execute_many, to bound socket pressure
+MAX_CONCURRENT_TOOLS = 8
+
+# Finished deferred results kept for await_tool; the oldest unclaimed are dropped
+MAX_DEFERRED_RESULTS = 64
+
+# Dispatch table entry: (tool, bound execute, validate_args or None)
+DispatchEntry = Tuple[BaseTool, Callable[..., Awaitable[Dict[str, Any]]], Optional[Callable]]
+
 
 class ToolExecutor:
     """Executes tools with proper error handling and logging."""
@@ -31,6 +46,35 @@ class ToolExecutor:
         
         # Register built-in tools
         self._register_builtin_tools()
+        
+        # Hot-path dispatch per tool name, checked against the registry on each
+        # call so tools re-registered on the registry directly are picked up
+        self._dispatch: Dict[str, DispatchEntry] = {}
+        for tool in self.registry.tools.values():
+            self._add_dispatch(tool)
+        
+        # Deferred executions by handle, moved to _results once they finish
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._results: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+    
+    def register(self, tool: BaseTool):
+        """Register a tool and add it to the dispatch table.
+        
+        Args:
+            tool: Tool to register (replaces any tool with the same name)
+        """
+        self.registry.register(tool)
+        self._add_dispatch(tool)
+    
+    def _add_dispatch(self, tool: BaseTool) -> DispatchEntry:
+        """Add a tool to the dispatch table, replacing any stale entry."""
+        # Skip validation for tools using the no-op default
+        validate = None
+        if type(tool).validate_args is not BaseTool.validate_args:
+            validate = tool.validate_args
+        entry = (tool, tool.execute, validate)
+        self._dispatch[tool.name] = entry
+        return entry
     
     def _register_builtin_tools(self):
         """Register built-in tool implementations."""
@@ -38,6 +82,7 @@ class ToolExecutor:
         self.registry.register(FileOperationsTool(self.e2b))
         self.registry.register(WebSearchTool())
         self.registry.register(DataAnalysisTool(self.e2b))
+        self.registry.register(AwaitToolTool(self))
     
     async def execute(
         self,
@@ -58,23 +103,28 @@ class ToolExecutor:
         self.logger.info(f"Executing tool: {tool_name}")
         
         tool = self.registry.get(tool_name)
-        
         if not tool:
             return {
                 "success": False,
                 "error": f"Tool not found: {tool_name}"
             }
         
+        entry = self._dispatch.get(tool_name)
+        if entry is None or entry[0] is not tool:
+            # Tool was registered (or replaced) on the registry directly
+            entry = self._add_dispatch(tool)
+        _, execute, validate = entry
+        
         try:
             # Validate arguments
-            if not tool.validate_args(arguments):
+            if validate is not None and not validate(arguments):
                 return {
                     "success": False,
                     "error": f"Invalid arguments for {tool_name}"
                 }
             
             # Execute tool
-            result = await tool.execute(
+            result = await execute(
                 session_id=session_id,
                 **arguments
             )
@@ -90,6 +140,134 @@ class ToolExecutor:
                 "error": str(e)
             }
     
+    async def execute_many(
+        self,
+        session_id: str,
+        tool_calls: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = MAX_CONCURRENT_TOOLS,
+        allow_deferred: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Execute independent tool calls concurrently.
+        
+        Args:
+            session_id: Session identifier
+            tool_calls: Dicts with tool "name" and "arguments"
+            max_concurrency: Cap on tools running at once (unbounded if None)
+            allow_deferred: Start tools marked deferred in the background and
+                            return their handles (see execute_deferred)
+            
+        Returns:
+            Tool execution results in the same order as tool_calls
+        """
+        self.logger.info(f"Executing {len(tool_calls)} tools concurrently")
+        
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        
+        async def run(call: Dict[str, Any]) -> Dict[str, Any]:
+            if allow_deferred:
+                tool = self.registry.get(call["name"])
+                if tool is not None and tool.deferred:
+                    return await self.execute_deferred(session_id, call["name"], call["arguments"])
+            if semaphore is None:
+                return await self.execute(session_id, call["name"], call["arguments"])
+            async with semaphore:
+                return await self.execute(session_id, call["name"], call["arguments"])
+        
+        results = await asyncio.gather(
+            *(run(call) for call in tool_calls),
+            return_exceptions=True
+        )
+        
+        results = [
+            {"success": False, "error": str(r)} if isinstance(r, BaseException) else r
+            for r in results
+        ]
+        
+        succeeded = sum(1 for r in results if r.get("success"))
+        self.logger.info(f"Batch completed: {succeeded}/{len(results)} succeeded")
+        
+        return results
+    
+    async def execute_deferred(
+        self,
+        session_id: str,
+        tool_name: str,
+        arguments: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Start a tool in the background and return a handle immediately.
+        
+        Args:
+            session_id: Session identifier
+            tool_name: Name of tool to execute
+            arguments: Tool arguments
+            
+        Returns:
+            Dict with the "handle" to pass to await_tool and "status" pending
+        """
+        handle = secrets.token_hex(8)
+        task = asyncio.create_task(self.execute(session_id, tool_name, arguments))
+        self._pending[handle] = task
+        task.add_done_callback(functools.partial(self._deferred_done, handle))
+        return {"handle": handle, "status": "pending"}
+    
+    def _deferred_done(self, handle: str, task: asyncio.Task):
+        """Move a finished deferred execution's result out of _pending."""
+        if self._pending.pop(handle, None) is None or task.cancelled():
+            return  # Already collected by await_tool, or cancelled
+        
+        error = task.exception()
+        self._results[handle] = (
+            {"success": False, "error": str(error)} if error else task.result()
+        )
+        while len(self._results) > MAX_DEFERRED_RESULTS:
+            dropped, _ = self._results.popitem(last=False)
+            self.logger.warning(f"Dropped unclaimed result for tool handle {dropped}")
+    
+    async def await_tool(
+        self,
+        handle: str,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Wait for a deferred tool execution to finish.
+        
+        On timeout the tool keeps running and the handle stays valid. Each
+        result can be collected once.
+        
+        Args:
+            handle: Handle returned by execute_deferred
+            timeout: Seconds to wait (forever if None)
+            
+        Returns:
+            Tool execution result, or a pending status on timeout
+        """
+        result = self._results.pop(handle, None)
+        if result is not None:
+            return result
+        
+        task = self._pending.get(handle)
+        if task is None:
+            return {"success": False, "error": f"Unknown tool handle: {handle}"}
+        
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            return {"handle": handle, "status": "pending"}
+        
+        # Claim it here in case the done callback has not run yet
+        self._pending.pop(handle, None)
+        self._results.pop(handle, None)
+        return result
+    
+    async def cancel_deferred(self):
+        """Cancel deferred executions still running and drop unclaimed results."""
+        tasks = list(self._pending.values())
+        self._pending.clear()
+        self._results.clear()
+        
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
     def get_tool_schemas(self) -> List[Dict]:
         """Get all tool schemas for function calling."""
         return self.registry.get_schemas()
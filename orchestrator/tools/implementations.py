@@ -1,26 +1,45 @@
 """Built-in tool implementations."""
-from typing import Dict, Any
-from orchestrator.tools.base import BaseTool
+import base64
+from typing import Dict, Any, Optional, Set, Union
+from orchestrator.tools.base import BaseTool, function_schema
 from orchestrator.providers.e2b import E2BProvider
 
+# Appended to the descriptions of deferred tools so the model knows to collect results
+_DEFERRED_NOTE = (
+    " Runs in the background: returns a handle right away; "
+    "call await_tool with it to get the result."
+)
+
 
 class CodeExecutionTool(BaseTool):
     """Execute Python code in E2B sandbox."""
     
+    name = "execute_code"
+    description = (
+        "Execute Python code in secure sandbox. "
+        "Returns stdout, stderr, and any generated artifacts."
+    )
+    SCHEMA = function_schema(name, description, {
+        "type": "object",
+        "properties": {
+            "code": {
+                "type": "string",
+                "description": "Python code to execute"
+            }
+        },
+        "required": ["code"]
+    })
+    
     def __init__(self, e2b_provider: E2BProvider):
-        super().__init__(
-            name="execute_code",
-            description="Execute Python code in secure sandbox. Returns stdout, stderr, and any generated artifacts."
-        )
+        super().__init__()
         self.e2b = e2b_provider
     
     async def execute(self, session_id: str, code: str, **kwargs) -> Dict[str, Any]:
         """Execute code in E2B sandbox."""
         # Ensure sandbox exists
-        if not self.e2b.get_sandbox(session_id):
-            self.e2b.create_sandbox(session_id)
+        await self.e2b.acquire(session_id)
         
-        result = self.e2b.execute_code(session_id, code)
+        result = await self.e2b.execute_code_async(session_id, code)
         
         return {
             "success": result["success"],
@@ -29,35 +48,39 @@ class CodeExecutionTool(BaseTool):
             "error": result.get("error"),
             "artifacts": result.get("artifacts", [])
         }
-    
-    def get_schema(self) -> Dict:
-        return {
-            "type": "function",
-            "function": {
-                "name": self.name,
-                "description": self.description,
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "code": {
-                            "type": "string",
-                            "description": "Python code to execute"
-                        }
-                    },
-                    "required": ["code"]
-                }
-            }
-        }
 
 
 class FileOperationsTool(BaseTool):
     """File operations in E2B sandbox."""
     
+    name = "file_operations"
+    description = "Read, write, or list files in the sandbox filesystem"
+    SCHEMA = function_schema(name, description, {
+        "type": "object",
+        "properties": {
+            "operation": {
+                "type": "string",
+                "enum": ["read", "write", "list"],
+                "description": "File operation to perform"
+            },
+            "path": {
+                "type": "string",
+                "description": "File or directory path"
+            },
+            "content": {
+                "type": "string",
+                "description": "Content to write (for write operation)"
+            },
+            "binary": {
+                "type": "boolean",
+                "description": "Return file content base64-encoded (for read operation)"
+            }
+        },
+        "required": ["operation", "path"]
+    })
+    
     def __init__(self, e2b_provider: E2BProvider):
-        super().__init__(
-            name="file_operations",
-            description="Read, write, or list files in the sandbox filesystem"
-        )
+        super().__init__()
         self.e2b = e2b_provider
     
     async def execute(
@@ -65,15 +88,32 @@ class FileOperationsTool(BaseTool):
         session_id: str,
         operation: str,
         path: str,
-        content: str = None,
+        content: Union[str, bytes] = None,
+        binary: bool = False,
         **kwargs
     ) -> Dict[str, Any]:
-        """Execute file operation."""
+        """Execute file operation.
+        
+        Reads return text when the file is valid UTF-8 and ``content_b64``
+        otherwise (or when ``binary`` is set). Writes accept bytes as-is.
+        """
         if operation == "read":
-            data = self.e2b.read_file(session_id, path)
+            data = await self.e2b.read_file_async(session_id, path, binary=True)
+            
+            # Return text when asked for it and the file is valid UTF-8
+            if not binary:
+                try:
+                    return {
+                        "success": True,
+                        "content": data.decode('utf-8', errors='strict'),
+                        "path": path
+                    }
+                except UnicodeDecodeError:
+                    pass
+            
             return {
                 "success": True,
-                "content": data.decode('utf-8'),
+                "content_b64": base64.b64encode(data).decode('ascii'),
                 "path": path
             }
         
@@ -81,7 +121,9 @@ class FileOperationsTool(BaseTool):
             if not content:
                 return {"success": False, "error": "Content required for write"}
             
-            self.e2b.write_file(session_id, path, content.encode('utf-8'))
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            await self.e2b.write_file_async(session_id, path, content)
             return {
                 "success": True,
                 "path": path,
@@ -89,7 +131,7 @@ class FileOperationsTool(BaseTool):
             }
         
         elif operation == "list":
-            files = self.e2b.list_files(session_id, path)
+            files = await self.e2b.list_files_async(session_id, path)
             return {
                 "success": True,
                 "files": files,
@@ -97,44 +139,24 @@ class FileOperationsTool(BaseTool):
             }
         
         return {"success": False, "error": f"Unknown operation: {operation}"}
-    
-    def get_schema(self) -> Dict:
-        return {
-            "type": "function",
-            "function": {
-                "name": self.name,
-                "description": self.description,
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "operation": {
-                            "type": "string",
-                            "enum": ["read", "write", "list"],
-                            "description": "File operation to perform"
-                        },
-                        "path": {
-                            "type": "string",
-                            "description": "File or directory path"
-                        },
-                        "content": {
-                            "type": "string",
-                            "description": "Content to write (for write operation)"
-                        }
-                    },
-                    "required": ["operation", "path"]
-                }
-            }
-        }
 
 
 class WebSearchTool(BaseTool):
     """Web search tool (placeholder)."""
     
-    def __init__(self):
-        super().__init__(
-            name="web_search",
-            description="Search the web for information"
-        )
+    name = "web_search"
+    description = "Search the web for information" + _DEFERRED_NOTE
+    deferred = True
+    SCHEMA = function_schema(name, description, {
+        "type": "object",
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": "Search query"
+            }
+        },
+        "required": ["query"]
+    })
     
     async def execute(self, session_id: str, query: str, **kwargs) -> Dict[str, Any]:
         """Execute web search."""
@@ -151,35 +173,68 @@ class WebSearchTool(BaseTool):
             "query": query
         }
     
-    def get_schema(self) -> Dict:
-        return {
-            "type": "function",
-            "function": {
-                "name": self.name,
-                "description": self.description,
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "Search query"
-                        }
-                    },
-                    "required": ["query"]
-                }
-            }
-        }
+
+
+# Analysis helpers defined once per sandbox kernel; later calls send one line
+_ANALYSIS_HELPERS = """
+import pandas as pd
+
+def _analysis_summary(file_path):
+    df = pd.read_csv(file_path)
+    print("Shape:", df.shape)
+    print("\\nColumn Types:")
+    print(df.dtypes)
+    print("\\nSummary Statistics:")
+    print(df.describe())
+    print("\\nMissing Values:")
+    print(df.isnull().sum())
+
+def _analysis_visualize(file_path):
+    import matplotlib.pyplot as plt
+    df = pd.read_csv(file_path)
+    df.hist(figsize=(12, 8), bins=20)
+    plt.tight_layout()
+    plt.savefig('/tmp/visualization.png')
+    print("Visualization saved to /tmp/visualization.png")
+"""
+
+_ANALYSIS_FUNCTIONS = {
+    "summary": "_analysis_summary",
+    "visualize": "_analysis_visualize",
+}
 
 
 class DataAnalysisTool(BaseTool):
     """Data analysis with pandas."""
     
+    name = "analyze_data"
+    description = (
+        "Analyze CSV/Excel data with pandas - get summary statistics, correlations, visualizations"
+        + _DEFERRED_NOTE
+    )
+    deferred = True
+    SCHEMA = function_schema(name, description, {
+        "type": "object",
+        "properties": {
+            "file_path": {
+                "type": "string",
+                "description": "Path to CSV/Excel file"
+            },
+            "analysis_type": {
+                "type": "string",
+                "enum": ["summary", "visualize", "correlate"],
+                "description": "Type of analysis to perform"
+            }
+        },
+        "required": ["file_path"]
+    })
+    
     def __init__(self, e2b_provider: E2BProvider):
-        super().__init__(
-            name="analyze_data",
-            description="Analyze CSV/Excel data with pandas - get summary statistics, correlations, visualizations"
-        )
+        super().__init__()
         self.e2b = e2b_provider
+        # Sandbox IDs whose kernel already has the analysis helpers
+        self._bootstrapped: Set[str] = set()
+        self.e2b.add_close_listener(self._bootstrapped.discard)
     
     async def execute(
         self,
@@ -189,37 +244,22 @@ class DataAnalysisTool(BaseTool):
         **kwargs
     ) -> Dict[str, Any]:
         """Execute data analysis."""
-        # Generate pandas code based on analysis type
-        if analysis_type == "summary":
-            code = f"""
-import pandas as pd
-df = pd.read_csv('{file_path}')
-print("Shape:", df.shape)
-print("\\nColumn Types:")
-print(df.dtypes)
-print("\\nSummary Statistics:")
-print(df.describe())
-print("\\nMissing Values:")
-print(df.isnull().sum())
-"""
-        elif analysis_type == "visualize":
-            code = f"""
-import pandas as pd
-import matplotlib.pyplot as plt
-df = pd.read_csv('{file_path}')
-df.hist(figsize=(12, 8), bins=20)
-plt.tight_layout()
-plt.savefig('/tmp/visualization.png')
-print("Visualization saved to /tmp/visualization.png")
-"""
-        else:
+        function = _ANALYSIS_FUNCTIONS.get(analysis_type)
+        if not function:
             return {"success": False, "error": f"Unknown analysis type: {analysis_type}"}
         
         # Ensure sandbox exists
-        if not self.e2b.get_sandbox(session_id):
-            self.e2b.create_sandbox(session_id)
+        sandbox = await self.e2b.acquire(session_id)
+        
+        # repr() quotes the path safely instead of splicing it into source
+        call = f"{function}({file_path!r})"
+        bootstrapped = sandbox.sandbox_id in self._bootstrapped
+        result = await self._run(session_id, sandbox.sandbox_id, call, bootstrap=not bootstrapped)
         
-        result = self.e2b.execute_code(session_id, code)
+        if bootstrapped and "NameError" in (result.get("error") or ""):
+            # Kernel restarted and lost the helpers; define them again and retry once
+            self._bootstrapped.discard(sandbox.sandbox_id)
+            result = await self._run(session_id, sandbox.sandbox_id, call, bootstrap=True)
         
         return {
             "success": result["success"],
@@ -229,26 +269,54 @@ print("Visualization saved to /tmp/visualization.png")
             "artifacts": result.get("artifacts", [])
         }
     
-    def get_schema(self) -> Dict:
-        return {
-            "type": "function",
-            "function": {
-                "name": self.name,
-                "description": self.description,
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "file_path": {
-                            "type": "string",
-                            "description": "Path to CSV/Excel file"
-                        },
-                        "analysis_type": {
-                            "type": "string",
-                            "enum": ["summary", "visualize", "correlate"],
-                            "description": "Type of analysis to perform"
-                        }
-                    },
-                    "required": ["file_path"]
-                }
+    async def _run(
+        self,
+        session_id: str,
+        sandbox_id: str,
+        call: str,
+        bootstrap: bool
+    ) -> Dict[str, Any]:
+        """Run one helper call, defining the helpers first when bootstrap is set."""
+        code = _ANALYSIS_HELPERS + call if bootstrap else call
+        result = await self.e2b.execute_code_async(session_id, code)
+        
+        if bootstrap and result["success"]:
+            self._bootstrapped.add(sandbox_id)
+        
+        return result
+
+
+class AwaitToolTool(BaseTool):
+    """Collect the result of a deferred tool call."""
+    
+    name = "await_tool"
+    description = "Wait for a background tool call and return its result"
+    SCHEMA = function_schema(name, description, {
+        "type": "object",
+        "properties": {
+            "handle": {
+                "type": "string",
+                "description": "Handle returned by the deferred tool call"
+            },
+            "timeout": {
+                "type": "number",
+                "description": "Seconds to wait before returning a pending status again"
             }
-        }
+        },
+        "required": ["handle"]
+    })
+    
+    def __init__(self, executor):
+        """Initialize with the ToolExecutor that started the deferred calls."""
+        super().__init__()
+        self.executor = executor
+    
+    async def execute(
+        self,
+        session_id: str,
+        handle: str,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Wait for the deferred call behind handle."""
+        return await self.executor.await_tool(handle, timeout)
@@ -1,4 +1,5 @@
 """Tool registry for loading and managing tools."""
+import functools
 import yaml
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -6,6 +7,20 @@ from typing import Dict, List, Optional
 from orchestrator.tools.base import BaseTool
 from orchestrator.utils.logging import get_logger
 
+# libyaml C loader when available, pure-Python loader otherwise
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_definition(path: str, mtime_ns: int, size: int) -> Optional[Dict]:
+    """Parse a YAML tool definition.
+    
+    Cached per (path, mtime, size), so unchanged files are parsed once per
+    process. Callers must not mutate the returned dict.
+    """
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
 
 class ToolRegistry:
     """Registry for managing available tools."""
@@ -19,6 +34,7 @@ class ToolRegistry:
         self.registry_path = Path(registry_path)
         self.tools: Dict[str, BaseTool] = {}
         self.definitions: Dict[str, Dict] = {}
+        self._schema_cache: Optional[List[Dict]] = None
         self.logger = get_logger("tools.registry")
         
         self._load_definitions()
@@ -31,12 +47,12 @@ class ToolRegistry:
         
         for yaml_file in self.registry_path.glob("*.yaml"):
             try:
-                with open(yaml_file, 'r') as f:
-                    definition = yaml.safe_load(f)
-                    
-                    if definition and "name" in definition:
-                        self.definitions[definition["name"]] = definition
-                        self.logger.info(f"Loaded tool definition: {definition['name']}")
+                stat = yaml_file.stat()
+                definition = _parse_definition(str(yaml_file), stat.st_mtime_ns, stat.st_size)
+                
+                if definition and "name" in definition:
+                    self.definitions[definition["name"]] = definition
+                    self.logger.info(f"Loaded tool definition: {definition['name']}")
             except Exception as e:
                 self.logger.error(f"Failed to load {yaml_file}: {e}")
     
@@ -47,6 +63,7 @@ class ToolRegistry:
             tool: Tool to register
         """
         self.tools[tool.name] = tool
+        self._schema_cache = None
         self.logger.info(f"Registered tool: {tool.name}")
     
     def get(self, name: str) -> Optional[BaseTool]:
@@ -63,12 +80,10 @@ class ToolRegistry:
         Returns:
             List of OpenAI function schemas
         """
-        schemas = []
-        
-        for tool in self.tools.values():
-            schemas.append(tool.get_schema())
+        if self._schema_cache is None:
+            self._schema_cache = [tool.get_schema() for tool in self.tools.values()]
         
-        return schemas
+        return self._schema_cache
     
     def get_definition(self, name: str) -> Optional[Dict]:
         """Get tool definition from YAML."""
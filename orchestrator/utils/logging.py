@@ -17,13 +17,24 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m'
     }
     
-    def format(self, record):
-        log_color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         reset = self.COLORS['RESET']
-        
+        self._painted = {
+            level: f"{color}{level}{reset}"
+            for level, color in self.COLORS.items()
+            if level != 'RESET'
+        }
+    
+    def format(self, record):
         # Format: [TIME] LEVEL NAME - MESSAGE
-        record.levelname = f"{log_color}{record.levelname}{reset}"
-        return super().format(record)
+        levelname = record.levelname
+        record.levelname = self._painted.get(levelname, levelname)
+        try:
+            return super().format(record)
+        finally:
+            # Records are shared across handlers - keep the file log free of ANSI codes
+            record.levelname = levelname
 
 
 def setup_logging(
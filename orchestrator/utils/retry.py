@@ -1,6 +1,7 @@
 """Retry logic with exponential backoff."""
 import asyncio
 import functools
+import time
 from typing import Callable, Any
 import random
 
@@ -21,60 +22,45 @@ def with_retry(
         max_delay: Maximum delay in seconds
         exceptions: Tuple of exceptions to catch
     """
+    # Backoff schedule is fixed, so compute it once per decorator
+    if exponential_backoff:
+        delays = [min(base_delay * (2 ** i), max_delay) for i in range(max_attempts - 1)]
+    else:
+        delays = None
+    
+    def next_delay(attempt: int) -> float:
+        if delays is None:
+            return base_delay
+        return delays[attempt] + random.random()
+    
     def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        async def async_wrapper(*args, **kwargs) -> Any:
-            last_exception = None
-            
-            for attempt in range(max_attempts):
-                try:
-                    return await func(*args, **kwargs)
-                except exceptions as e:
-                    last_exception = e
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                for attempt in range(max_attempts):
+                    try:
+                        return await func(*args, **kwargs)
+                    except exceptions:
+                        if attempt == max_attempts - 1:
+                            raise
                     
-                    if attempt < max_attempts - 1:
-                        # Calculate delay
-                        if exponential_backoff:
-                            delay = min(
-                                base_delay * (2 ** attempt) + random.uniform(0, 1),
-                                max_delay
-                            )
-                        else:
-                            delay = base_delay
-                        
-                        await asyncio.sleep(delay)
+                    await asyncio.sleep(next_delay(attempt))
             
-            # All attempts failed
-            raise last_exception
+            return async_wrapper
+        
+        sleep = time.sleep
         
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs) -> Any:
-            last_exception = None
-            
             for attempt in range(max_attempts):
                 try:
                     return func(*args, **kwargs)
-                except exceptions as e:
-                    last_exception = e
-                    
-                    if attempt < max_attempts - 1:
-                        if exponential_backoff:
-                            delay = min(
-                                base_delay * (2 ** attempt) + random.uniform(0, 1),
-                                max_delay
-                            )
-                        else:
-                            delay = base_delay
-                        
-                        import time
-                        time.sleep(delay)
-            
-            raise last_exception
+                except exceptions:
+                    if attempt == max_attempts - 1:
+                        raise
+                
+                sleep(next_delay(attempt))
         
-        # Return appropriate wrapper based on function type
-        if asyncio.iscoroutinefunction(func):
-            return async_wrapper
-        else:
-            return sync_wrapper
+        return sync_wrapper
     
     return decorator
@@ -1,5 +1,6 @@
 """Streaming utilities."""
-from typing import AsyncIterator, Iterator
+from collections import deque
+from typing import AsyncIterator, Deque, Iterator, Optional
 import asyncio
 
 
@@ -12,9 +13,10 @@ async def stream_to_async(iterator: Iterator) -> AsyncIterator:
     Yields:
         Items from iterator
     """
-    for item in iterator:
+    for i, item in enumerate(iterator):
         yield item
-        await asyncio.sleep(0)  # Allow other tasks to run
+        if (i & 63) == 0:
+            await asyncio.sleep(0)  # Let other tasks run every 64 items
 
 
 class StreamBuffer:
@@ -26,20 +28,24 @@ class StreamBuffer:
         Args:
             max_size: Maximum buffer size
         """
-        self.buffer = []
+        # Bounded deque drops the oldest chunk on overflow in O(1)
+        self.buffer: Deque[str] = deque(maxlen=max_size)
         self.max_size = max_size
+        self._joined: Optional[str] = None
     
     def add(self, chunk: str):
         """Add chunk to buffer."""
         self.buffer.append(chunk)
-        
-        if len(self.buffer) > self.max_size:
-            self.buffer = self.buffer[-self.max_size:]
+        self._joined = None
     
     def get_all(self) -> str:
         """Get all buffered content."""
-        return "".join(self.buffer)
+        # Join once per change rather than on every call
+        if self._joined is None:
+            self._joined = "".join(self.buffer)
+        return self._joined
     
     def clear(self):
         """Clear buffer."""
         self.buffer.clear()
+        self._joined = None
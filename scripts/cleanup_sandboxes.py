@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """Cleanup all E2B sandboxes."""
 import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -8,6 +10,17 @@ from dotenv import load_dotenv
 parent_dir = Path(__file__).parent.parent
 load_dotenv(parent_dir / ".env")
 
+E2B_SANDBOXES_URL = "https://api.e2b.dev/sandboxes"
+
+# (connect, read) seconds; fail fast instead of hanging on a dead network
+REQUEST_TIMEOUT = (3.05, 10)
+
+# Field names the API has used for the sandbox id
+SANDBOX_ID_KEYS = ("sandboxID", "sandbox_id", "id")
+
+# Kills are I/O-bound request round-trips, so run this many at once
+MAX_PARALLEL_KILLS = 32
+
 def cleanup_all_sandboxes():
     """Kill all running E2B sandboxes."""
     api_key = os.getenv("E2B_API_KEY")
@@ -24,16 +37,29 @@ def cleanup_all_sandboxes():
         try:
             # Try to list sandboxes using the API
             import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
             
-            headers = {
+            # One keep-alive session so every request reuses pooled connections;
+            # transient failures are retried with backoff by urllib3
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                raise_on_status=False  # Hand the last response back for reporting
+            )
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=MAX_PARALLEL_KILLS,
+                max_retries=retry
+            ))
+            session.headers.update({
                 "X-API-Key": api_key,
                 "Content-Type": "application/json"
-            }
+            })
             
-            response = requests.get(
-                "https://api.e2b.dev/sandboxes",
-                headers=headers
-            )
+            response = session.get(E2B_SANDBOXES_URL, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 200:
                 sandboxes = response.json()
@@ -44,20 +70,37 @@ def cleanup_all_sandboxes():
                 
                 print(f"Found {len(sandboxes)} running sandbox(es)\n")
                 
-                for sb in sandboxes:
-                    sandbox_id = sb.get("sandboxID") or sb.get("sandbox_id") or sb.get("id")
-                    if not sandbox_id:
-                        continue
+                # All records share one shape, so resolve the id field once
+                id_key = next((k for k in SANDBOX_ID_KEYS if k in sandboxes[0]), None)
+                if id_key is None:
+                    print("❌ Could not find a sandbox id field in the API response")
+                    return
+                sandbox_ids = [sb[id_key] for sb in sandboxes if sb.get(id_key)]
+                
+                def kill(sandbox_id):
+                    # The REST API terminates by id; no SDK client needed
+                    session.delete(
+                        f"{E2B_SANDBOXES_URL}/{sandbox_id}", timeout=REQUEST_TIMEOUT
+                    ).raise_for_status()
+                
+                killed = 0
+                workers = min(MAX_PARALLEL_KILLS, len(sandbox_ids) or 1)
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = {
+                        pool.submit(kill, sandbox_id): sandbox_id for sandbox_id in sandbox_ids
+                    }
+                    print(f"  Killing {len(futures)} sandbox(es)...")
                     
-                    try:
-                        print(f"  Killing {sandbox_id}...")
-                        sandbox = Sandbox(sandbox_id=sandbox_id, api_key=api_key)
-                        sandbox.kill()
-                        print("    ✓ Killed")
-                    except Exception as e:
-                        print(f"    ✗ Error: {e}")
+                    for future in as_completed(futures):
+                        sandbox_id = futures[future]
+                        try:
+                            future.result()
+                            killed += 1
+                            print(f"    ✓ Killed {sandbox_id}")
+                        except Exception as e:
+                            print(f"    ✗ {sandbox_id}: {e}")
                 
-                print(f"\n✅ Cleanup complete - killed {len(sandboxes)} sandbox(es)")
+                print(f"\n✅ Cleanup complete - killed {killed} sandbox(es)")
             else:
                 print(f"❌ Failed to list sandboxes: {response.status_code}")
                 print(f"Response: {response.text}")
@@ -83,7 +126,6 @@ def cleanup_all_sandboxes():
     
     except Exception as e:
         print(f"❌ Error: {e}")
-        import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
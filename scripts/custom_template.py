@@ -4,21 +4,52 @@ Example: Using Custom E2B Template
 This demonstrates how to use your custom Docker image with E2B sandboxes.
 """
 
+import functools
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict
 from e2b_code_interpreter import Sandbox
 
+ENV_PATH = Path(__file__).parent.parent / ".env"
+
+# Package probe sent to the custom sandbox, read once at import
+PROBE_SRC = (Path(__file__).with_name("resources") / "probe.py").read_text()
+
+# Replace this with your actual template ID after running e2b template build
+CUSTOM_TEMPLATE_ID = "en7sb4k1n268scs49jnj"  # Your custom template ID
+
+# KEY=value lines; comments and blank lines never match
+_ENV_RE = re.compile(r'(?m)^[ \t]*([A-Za-z_]\w*)[ \t]*=[ \t]*(.*?)[ \t\r]*$')
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_env(path: str, mtime_ns: int) -> Dict[str, str]:
+    """Parse a .env file once; mtime_ns invalidates the cache on edits."""
+    text = Path(path).read_bytes().decode("utf-8", "replace")
+    return dict(_ENV_RE.findall(text))
+
 # Load .env file
 def load_env():
     """Load environment variables from .env file."""
-    env_path = Path(__file__).parent.parent / ".env"
-    if env_path.exists():
-        with open(env_path) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key] = value
+    try:
+        mtime_ns = ENV_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return
+    # Variables already set in the environment win, as with load_dotenv
+    for key, value in _parse_env(str(ENV_PATH), mtime_ns).items():
+        os.environ.setdefault(key, value)
+
+def _discard_sandbox(future):
+    """Kill a sandbox that is still being created in the background."""
+    if future is None or future.cancel():
+        return
+    try:
+        future.result().kill()
+    except Exception as e:
+        # Creation itself may have failed; don't mask the original error
+        print(f"⚠️  Could not clean up custom sandbox: {e}")
 
 def main():
     """Demo custom template usage."""
@@ -37,79 +68,59 @@ def main():
     print("🚀 E2B Custom Template Demo")
     print("=" * 50)
     
+    # Custom template boot is slow, so start it while the default demo runs
+    executor = ThreadPoolExecutor(max_workers=1)
+    custom_future = None
+    if CUSTOM_TEMPLATE_ID != "your-custom-template-id":
+        custom_future = executor.submit(
+            Sandbox,
+            template=CUSTOM_TEMPLATE_ID,
+            api_key=api_key,
+            timeout=180  # 3 minutes for first run
+        )
+    executor.shutdown(wait=False)
+    
     # Method 1: Using default template
     print("\n📦 Method 1: Default Template")
     print("-" * 50)
-    sandbox_default = Sandbox(api_key=api_key)
-    print(f"✓ Sandbox created: {sandbox_default.sandbox_id}")
-    
-    result = sandbox_default.run_code("import sys; print(f'Python: {sys.version}')")
-    print(f"Output: {result.logs.stdout}")
-    sandbox_default.kill()
-    print("✓ Sandbox closed")
+    try:
+        sandbox_default = Sandbox(api_key=api_key)
+        print(f"✓ Sandbox created: {sandbox_default.sandbox_id}")
+        
+        try:
+            result = sandbox_default.run_code("import sys; print(f'Python: {sys.version}')")
+            print(f"Output: {result.logs.stdout}")
+        finally:
+            sandbox_default.kill()
+        print("✓ Sandbox closed")
+    except BaseException:
+        # Don't leak the custom sandbox booting in the background
+        _discard_sandbox(custom_future)
+        raise
     
     # Method 2: Using custom template (replace with your template ID)
     print("\n🎨 Method 2: Custom Template")
     print("-" * 50)
     
-    # Replace this with your actual template ID after running e2b template build
-    CUSTOM_TEMPLATE_ID = "en7sb4k1n268scs49jnj"  # Your custom template ID
-    
     print(f"Template ID: {CUSTOM_TEMPLATE_ID}")
     
     if CUSTOM_TEMPLATE_ID == "your-custom-template-id":
         print("⚠️  Please update CUSTOM_TEMPLATE_ID with your actual template ID")
         print("   Run: ./scripts/build_e2b_template.sh to create your template")
     else:
-        # Increase timeout significantly for initial setup
-        sandbox_custom = Sandbox(
-            template=CUSTOM_TEMPLATE_ID,
-            api_key=api_key,
-            timeout=180  # 3 minutes for first run
-        )
+        sandbox_custom = custom_future.result()
         print(f"✓ Custom sandbox created: {sandbox_custom.sandbox_id}")
         print("⏳ Waiting for code interpreter to start (this may take a moment)...")
         
         # Test custom packages
-        test_code = """
-print("Testing custom template...")
-import sys
-print(f"Python version: {sys.version}")
-
-try:
-    import numpy as np
-    print(f"NumPy: {np.__version__}")
-except ImportError as e:
-    print(f"NumPy error: {e}")
-
-try:
-    import pandas as pd
-    print(f"Pandas: {pd.__version__}")
-except ImportError as e:
-    print(f"Pandas error: {e}")
-
-try:
-    import sklearn
-    print(f"Scikit-learn: {sklearn.__version__}")
-except ImportError as e:
-    print(f"Scikit-learn error: {e}")
-
-try:
-    import matplotlib
-    print(f"Matplotlib: {matplotlib.__version__}")
-except ImportError as e:
-    print(f"Matplotlib error: {e}")
-
-print("All packages working!")
-"""
-        
-        result = sandbox_custom.run_code(test_code)
-        print(f"Output:\n{result.logs.stdout}")
-        
-        if result.error:
-            print(f"Error: {result.error}")
-        
-        sandbox_custom.kill()
+        try:
+            result = sandbox_custom.run_code(PROBE_SRC)
+            print(f"Output:\n{result.logs.stdout}")
+            
+            if result.error:
+                print(f"Error: {result.error}")
+        finally:
+            sandbox_custom.kill()
         print("✓ Custom sandbox closed")
     
     print("\n" + "=" * 50)
@@ -1,28 +1,67 @@
 #!/usr/bin/env python3
 """List available Gemini models."""
+import argparse
+import json
 import os
+import time
+import traceback
 from pathlib import Path
-from dotenv import load_dotenv
-from google import genai
 
-# Load .env from parent directory
-parent_dir = Path(__file__).parent.parent
-load_dotenv(parent_dir / ".env")
+# Model list changes rarely, so reuse it for a day unless --refresh is given
+CACHE_PATH = Path.home() / ".cache" / "sandbox-system" / "gemini_models.json"
+CACHE_TTL = 24 * 60 * 60
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
-print("Available Gemini models:")
-print("=" * 60)
+def load_cached_models():
+    """Return cached model names, or None if the cache is missing or stale."""
+    try:
+        if time.time() - CACHE_PATH.stat().st_mtime >= CACHE_TTL:
+            return None
+        with open(CACHE_PATH) as f:
+            return json.load(f)["models"]
+    except (OSError, ValueError, KeyError):
+        return None
 
-try:
-    # List all models
-    for model in client.models.list():
-        if "gemini" in model.name.lower():
-            print(f"✓ {model.name}")
+
+def fetch_models():
+    """List Gemini models from the API and cache the result."""
+    from dotenv import load_dotenv
+    from google import genai
+
+    # Load .env from parent directory
+    parent_dir = Path(__file__).parent.parent
+    load_dotenv(parent_dir / ".env")
+
+    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    names = [model.name for model in client.models.list() if "gemini" in model.name.lower()]
+
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_PATH, "w") as f:
+        json.dump({"models": names}, f)
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached model list")
+    args = parser.parse_args()
+
+    print("Available Gemini models:")
+    print("=" * 60)
+
+    try:
+        names = None if args.refresh else load_cached_models()
+        if names is None:
+            names = fetch_models()
+
+        for name in names:
+            print(f"✓ {name}")
             print()
-            
-except Exception as e:
-    print(f"Error: {e}")
-    import traceback
-    traceback.print_exc()
 
+    except Exception as e:
+        print(f"Error: {e}")
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
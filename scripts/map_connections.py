@@ -3,33 +3,139 @@
 Generate a visual connection map of all imports in the system.
 """
 import ast
+import functools
+import io
+import json
+import os
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Set
+from typing import Dict, Iterator, List, Optional, Set
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-def get_imports(file_path: Path) -> Set[str]:
-    """Extract all imports from a Python file."""
+# Parsed imports per file, reused while (mtime_ns, size) is unchanged
+CACHE_PATH = project_root / ".cache" / "map_connections.json"
+
+# Bump whenever _ImportVisitor or get_imports changes what gets collected
+CACHE_VERSION = 2
+
+# Directories never worth descending into
+SKIP_DIRS = {".venv", "__pycache__", ".git"}
+
+# Below this many files to parse, a process pool costs more than it saves
+PARALLEL_MIN_FILES = 32
+
+def load_cache() -> Dict[str, list]:
+    """Load the import cache, starting fresh if it is missing, unreadable or
+    written by a different CACHE_VERSION."""
     try:
-        with open(file_path, 'r') as f:
-            tree = ast.parse(f.read())
+        with open(CACHE_PATH, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("files", {})
+
+def save_cache(cache: Dict[str, list]):
+    """Write the import cache, tagged with CACHE_VERSION."""
+    CACHE_PATH.parent.mkdir(exist_ok=True)
+    with open(CACHE_PATH, 'w') as f:
+        json.dump({"version": CACHE_VERSION, "files": cache}, f)
+
+class _ImportVisitor(ast.NodeVisitor):
+    """Collect module-level imports without descending into defs or classes."""
+    
+    # Statements whose bodies can hold module-level imports (except* needs 3.11+)
+    _SCOPES = (ast.Module, ast.If, ast.Try, ast.With, ast.ExceptHandler) + (
+        (ast.TryStar,) if hasattr(ast, "TryStar") else ()
+    )
+    
+    def __init__(self):
+        self.imports: Set[str] = set()
+    
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.imports.add(alias.name)
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module:
+            self.imports.add(node.module)
+    
+    def generic_visit(self, node: ast.AST):
+        if isinstance(node, self._SCOPES):
+            super().generic_visit(node)
+
+def get_imports(file_path: Path) -> Optional[Set[str]]:
+    """Extract all imports from a Python file (None if it cannot be parsed)."""
+    try:
+        data = file_path.read_bytes()
+        # Substring scan is far cheaper than a parse; no match means no imports
+        if b"import" not in data:
+            return set()
         
-        imports = set()
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    imports.add(alias.name)
-            elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    imports.add(node.module)
+        # Parse with the running interpreter's grammar so newer syntax is mapped too
+        tree = ast.parse(data, filename=str(file_path))
         
-        return imports
+        visitor = _ImportVisitor()
+        visitor.visit(tree)
+        return visitor.imports
     except Exception as e:
         print(f"Error parsing {file_path}: {e}", file=sys.stderr)
-        return set()
+        return None
+
+def get_all_imports(py_files: List[Path], cache: Dict[str, list]) -> Dict[Path, Set[str]]:
+    """Get imports for every file, parsing only files changed since the cache.
+    
+    Parses fan out over a process pool once there are enough of them to
+    outweigh the worker start-up cost. Fresh parses are stored in the cache.
+    """
+    result: Dict[Path, Set[str]] = {}
+    stale = []
+    for file_path in py_files:
+        st = file_path.stat()
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = cache.get(str(file_path))
+        if entry and entry[0] == stamp:
+            result[file_path] = set(entry[1])
+        else:
+            stale.append((file_path, stamp))
+    
+    stale_files = [file_path for file_path, _ in stale]
+    if len(stale_files) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor() as executor:
+            parsed = list(executor.map(get_imports, stale_files, chunksize=8))
+    else:
+        parsed = [get_imports(file_path) for file_path in stale_files]
+    
+    for (file_path, stamp), imports in zip(stale, parsed):
+        if imports is None:
+            imports = set()
+        else:
+            cache[str(file_path)] = [stamp, sorted(imports)]
+        result[file_path] = imports
+    
+    return result
+
+def find_py_files(root: Path) -> Iterator[Path]:
+    """Yield Python files to map, pruning skipped directories while walking."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SKIP_DIRS:
+                    yield from find_py_files(Path(entry.path))
+            elif (
+                entry.name.endswith(".py")
+                and not entry.name.startswith("__")
+                and "verify" not in entry.name
+                and "map_connections" not in entry.name
+            ):
+                yield Path(entry.path)
 
 def filter_local_imports(imports: Set[str]) -> Set[str]:
     """Filter to only local orchestrator imports."""
@@ -40,109 +146,105 @@ def main():
     project_root = Path(__file__).parent
     
     # Find all Python files
-    py_files = list(project_root.rglob("*.py"))
-    py_files = [f for f in py_files if not f.name.startswith("__")]
-    py_files = [f for f in py_files if ".venv" not in str(f)]
-    py_files = [f for f in py_files if "verify" not in str(f)]
-    py_files = [f for f in py_files if "map_connections" not in str(f)]
+    py_files = list(find_py_files(project_root))
     
     # Build connection map
-    connections: Dict[str, Set[str]] = {}
+    cache = load_cache()
+    all_imports = get_all_imports(py_files, cache)
+    save_cache(cache)
     
-    for file_path in py_files:
-        relative_path = file_path.relative_to(project_root)
-        module_name = str(relative_path).replace("/", ".").replace(".py", "")
-        
-        imports = get_imports(file_path)
-        local_imports = filter_local_imports(imports)
-        
-        if module_name or local_imports:
-            connections[module_name] = local_imports
+    connections: Dict[str, Set[str]] = {
+        file_path.relative_to(project_root).with_suffix("").as_posix().replace("/", "."):
+            filter_local_imports(all_imports[file_path])
+        for file_path in py_files
+    }
     
-    # Print connection map
-    print("=" * 80)
-    print("SANDBOX SYSTEM - FILE CONNECTION MAP")
-    print("=" * 80)
-    print()
+    # Print connection map (buffered, written to stdout in one go)
+    buf = io.StringIO()
+    out = functools.partial(print, file=buf)
+    
+    out("=" * 80)
+    out("SANDBOX SYSTEM - FILE CONNECTION MAP")
+    out("=" * 80)
+    out()
     
     # Sort by dependency level (files with fewer imports first)
     sorted_files = sorted(connections.items(), key=lambda x: len(x[1]))
     
-    print("📊 DEPENDENCY LEVELS")
-    print("─" * 80)
-    print()
+    out("📊 DEPENDENCY LEVELS")
+    out("─" * 80)
+    out()
     
     # Level 0: No dependencies
-    print("🟢 LEVEL 0 - Independent Modules (No Internal Dependencies)")
-    print("─" * 80)
+    out("🟢 LEVEL 0 - Independent Modules (No Internal Dependencies)")
+    out("─" * 80)
     level0 = [(name, deps) for name, deps in sorted_files if len(deps) == 0]
     for name, deps in level0:
-        print(f"  • {name}")
-    print()
+        out(f"  • {name}")
+    out()
     
     # Level 1: 1-2 dependencies
-    print("🟡 LEVEL 1 - Basic Dependencies (1-2 imports)")
-    print("─" * 80)
+    out("🟡 LEVEL 1 - Basic Dependencies (1-2 imports)")
+    out("─" * 80)
     level1 = [(name, deps) for name, deps in sorted_files if 1 <= len(deps) <= 2]
     for name, deps in level1:
-        print(f"  • {name}")
+        out(f"  • {name}")
         for dep in sorted(deps):
-            print(f"      → {dep}")
-    print()
+            out(f"      → {dep}")
+    out()
     
     # Level 2: 3-4 dependencies
-    print("🟠 LEVEL 2 - Moderate Dependencies (3-4 imports)")
-    print("─" * 80)
+    out("🟠 LEVEL 2 - Moderate Dependencies (3-4 imports)")
+    out("─" * 80)
     level2 = [(name, deps) for name, deps in sorted_files if 3 <= len(deps) <= 4]
     for name, deps in level2:
-        print(f"  • {name}")
+        out(f"  • {name}")
         for dep in sorted(deps):
-            print(f"      → {dep}")
-    print()
+            out(f"      → {dep}")
+    out()
     
     # Level 3+: Many dependencies
-    print("🔴 LEVEL 3+ - Complex Dependencies (5+ imports)")
-    print("─" * 80)
+    out("🔴 LEVEL 3+ - Complex Dependencies (5+ imports)")
+    out("─" * 80)
     level3 = [(name, deps) for name, deps in sorted_files if len(deps) >= 5]
     for name, deps in level3:
-        print(f"  • {name} ({len(deps)} dependencies)")
+        out(f"  • {name} ({len(deps)} dependencies)")
         for dep in sorted(deps):
-            print(f"      → {dep}")
-    print()
-    
-    print("=" * 80)
-    print("📈 STATISTICS")
-    print("─" * 80)
-    print(f"Total files: {len(connections)}")
-    print(f"Level 0 (independent): {len(level0)}")
-    print(f"Level 1 (basic): {len(level1)}")
-    print(f"Level 2 (moderate): {len(level2)}")
-    print(f"Level 3+ (complex): {len(level3)}")
-    print()
+            out(f"      → {dep}")
+    out()
+    
+    out("=" * 80)
+    out("📈 STATISTICS")
+    out("─" * 80)
+    out(f"Total files: {len(connections)}")
+    out(f"Level 0 (independent): {len(level0)}")
+    out(f"Level 1 (basic): {len(level1)}")
+    out(f"Level 2 (moderate): {len(level2)}")
+    out(f"Level 3+ (complex): {len(level3)}")
+    out()
     
     # Calculate which files are most depended upon
-    print("=" * 80)
-    print("🎯 MOST IMPORTED MODULES")
-    print("─" * 80)
-    import_counts: Dict[str, int] = {}
-    for name, deps in connections.items():
-        for dep in deps:
-            import_counts[dep] = import_counts.get(dep, 0) + 1
-    
-    sorted_imports = sorted(import_counts.items(), key=lambda x: x[1], reverse=True)
-    for module, count in sorted_imports[:10]:
-        print(f"  {count}× {module}")
-    print()
-    
-    print("=" * 80)
-    print()
-    print("✅ Connection map generated successfully!")
-    print()
-    print("Key findings:")
-    print(f"  • {len(level0)} independent modules (good for testing)")
-    print(f"  • {len(level3)} complex modules (main entry points)")
-    print(f"  • Most depended on: {sorted_imports[0][0] if sorted_imports else 'None'}")
-    print()
+    out("=" * 80)
+    out("🎯 MOST IMPORTED MODULES")
+    out("─" * 80)
+    import_counts = Counter(dep for deps in connections.values() for dep in deps)
+    
+    sorted_imports = import_counts.most_common(10)
+    for module, count in sorted_imports:
+        out(f"  {count}× {module}")
+    out()
+    
+    out("=" * 80)
+    out()
+    out("✅ Connection map generated successfully!")
+    out()
+    out("Key findings:")
+    out(f"  • {len(level0)} independent modules (good for testing)")
+    out(f"  • {len(level3)} complex modules (main entry points)")
+    out(f"  • Most depended on: {sorted_imports[0][0] if sorted_imports else 'None'}")
+    out()
+    
+    sys.stdout.write(buf.getvalue())
 
 if __name__ == "__main__":
     main()
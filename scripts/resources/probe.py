@@ -0,0 +1,22 @@
+"""Probe run inside a custom-template sandbox to check installed packages."""
+import importlib
+import sys
+
+PACKAGES = [
+    ("numpy", "NumPy"),
+    ("pandas", "Pandas"),
+    ("sklearn", "Scikit-learn"),
+    ("matplotlib", "Matplotlib"),
+]
+
+print("Testing custom template...")
+print(f"Python version: {sys.version}")
+
+for module_name, label in PACKAGES:
+    try:
+        module = importlib.import_module(module_name)
+        print(f"{label}: {module.__version__}")
+    except ImportError as e:
+        print(f"{label} error: {e}")
+
+print("All packages working!")
@@ -3,25 +3,53 @@
 Verify all imports and connections in the sandbox system.
 Checks that all files can be imported without errors.
 """
+import argparse
+import importlib.util
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-def check_import(module_path: str, description: str) -> bool:
-    """Try to import a module and report result."""
+def import_error(module_path: str) -> Optional[Exception]:
+    """Try to import a module and return the error, if any."""
     try:
         __import__(module_path)
+        return None
+    except Exception as e:
+        return e
+
+def spec_error(module_path: str) -> Optional[Exception]:
+    """Check a module can be located without running it; return the error, if any."""
+    try:
+        if importlib.util.find_spec(module_path) is None:
+            return ModuleNotFoundError(f"No module named '{module_path}'")
+        return None
+    except Exception as e:
+        return e
+
+def report(description: str, error: Optional[Exception]) -> bool:
+    """Print an import result."""
+    if error is None:
         print(f"✅ {description}")
         return True
-    except Exception as e:
-        print(f"❌ {description}: {e}")
-        return False
+    print(f"❌ {description}: {error}")
+    return False
 
 def main():
     """Run all import checks."""
+    parser = argparse.ArgumentParser(description="Verify all imports in the sandbox system.")
+    parser.add_argument(
+        "--spec-only",
+        action="store_true",
+        help="Only check modules can be found (fast; does not execute them)"
+    )
+    args = parser.parse_args()
+    check = spec_error if args.spec_only else import_error
+    
     print("=" * 60)
     print("Sandbox System - Import Verification")
     print("=" * 60)
@@ -52,10 +80,14 @@ def main():
         ("main", "Main: Agent Runner"),
     ]
     
-    results = []
-    for module_path, description in checks:
-        result = check_import(module_path, description)
-        results.append(result)
+    # Imports overlap their file I/O across threads; report in check order
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        errors = list(executor.map(check, [module_path for module_path, _ in checks]))
+    
+    results = [
+        report(description, error)
+        for (_, description), error in zip(checks, errors)
+    ]
     
     print()
     print("=" * 60)
@@ -0,0 +1,85 @@
+"""Tests for ConversationManager history caching."""
+import asyncio
+
+from orchestrator.core.conversation import ConversationManager
+from orchestrator.core.memory import MemoryStore
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def contents(messages):
+    return [msg["content"] for msg in messages]
+
+
+def test_history_is_bounded_and_persisted():
+    memory = MemoryStore(storage_dir=None)
+    manager = ConversationManager(memory, max_history=3)
+
+    for i in range(5):
+        run(manager.add_message("s", "user", f"m{i}"))
+
+    assert contents(run(manager.get_messages("s"))) == ["m2", "m3", "m4"]
+    assert contents(run(memory.get("conversation:s"))) == ["m2", "m3", "m4"]
+
+
+def test_managers_sharing_a_store_see_each_others_messages():
+    memory = MemoryStore(storage_dir=None)
+    first = ConversationManager(memory)
+    second = ConversationManager(memory)
+
+    run(first.add_message("s", "user", "one"))
+    assert contents(run(second.get_messages("s"))) == ["one"]
+
+    run(second.add_message("s", "assistant", "two"))
+    run(first.add_message("s", "user", "three"))
+
+    assert contents(run(first.get_messages("s"))) == ["one", "two", "three"]
+    assert contents(run(second.get_messages("s"))) == ["one", "two", "three"]
+
+
+def test_unsaved_messages_survive_a_reload():
+    memory = MemoryStore(storage_dir=None)
+    buffered = ConversationManager(memory, persist_every=10)
+    other = ConversationManager(memory)
+
+    run(buffered.add_message("s", "user", "buffered"))
+    run(other.add_message("s", "user", "direct"))
+
+    assert contents(run(buffered.get_messages("s"))) == ["direct", "buffered"]
+    run(buffered.flush())
+    assert contents(run(memory.get("conversation:s"))) == ["direct", "buffered"]
+
+
+def test_least_recently_used_sessions_are_flushed_and_evicted():
+    memory = MemoryStore(storage_dir=None)
+    manager = ConversationManager(memory, persist_every=10, max_sessions=2)
+
+    run(manager.add_message("a", "user", "a1"))
+    run(manager.add_message("b", "user", "b1"))
+    run(manager.add_message("c", "user", "c1"))
+
+    assert list(manager._cache) == ["b", "c"]
+    assert contents(run(memory.get("conversation:a"))) == ["a1"]
+    assert contents(run(manager.get_messages("a"))) == ["a1"]
+
+
+def test_cached_history_skips_the_store_until_it_changes(monkeypatch):
+    memory = MemoryStore(storage_dir=None)
+    manager = ConversationManager(memory)
+    run(manager.add_message("s", "user", "one"))
+
+    reads = []
+    get = memory.get
+    monkeypatch.setattr(memory, "get", lambda *a, **kw: reads.append(a) or get(*a, **kw))
+
+    run(manager.get_messages("s"))
+    run(manager.add_message("s", "assistant", "two"))
+    assert reads == []
+
+    # A write from outside the manager forces one reload
+    run(memory.set("conversation:s", [{"role": "user", "content": "edited"}]))
+    assert contents(run(manager.get_messages("s"))) == ["edited"]
+    run(manager.get_messages("s"))
+    assert len(reads) == 1
@@ -0,0 +1,137 @@
+"""Tests for the E2BProvider warm pool (prewarm, acquire, refill, drain)."""
+import asyncio
+import itertools
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("e2b_code_interpreter")
+
+from orchestrator.providers import e2b  # noqa: E402
+from orchestrator.providers.e2b import E2BProvider  # noqa: E402
+
+TEMPLATE = E2BProvider.DEFAULT_TEMPLATE
+
+
+class FakeSandbox:
+    """Stands in for e2b_code_interpreter.Sandbox and records its lifecycle."""
+
+    ids = itertools.count()
+    created = []
+    killed = []
+    # Set to make creations block until the test releases them
+    gate = None
+    failures = 0
+
+    def __init__(self, template=None, api_key=None, timeout=None):
+        if FakeSandbox.gate is not None:
+            FakeSandbox.gate.wait(5)
+        if FakeSandbox.failures:
+            FakeSandbox.failures -= 1
+            raise RuntimeError("boot failed")
+        self.sandbox_id = f"sb{next(self.ids)}"
+        self.timeouts = [timeout]
+        FakeSandbox.created.append(self)
+
+    def set_timeout(self, timeout):
+        self.timeouts.append(timeout)
+
+    def kill(self):
+        FakeSandbox.killed.append(self)
+
+
+@pytest.fixture(autouse=True)
+def fake_sandbox(monkeypatch):
+    FakeSandbox.created = []
+    FakeSandbox.killed = []
+    FakeSandbox.gate = None
+    FakeSandbox.failures = 0
+    monkeypatch.setattr(e2b, "Sandbox", FakeSandbox)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_prewarms_do_not_overfill_the_pool():
+    provider = E2BProvider(api_key="k")
+
+    async def scenario():
+        await asyncio.gather(provider.prewarm_async(3), provider.prewarm_async(3))
+        assert provider._pool_size(TEMPLATE) == 3
+        assert await provider.prewarm_async(50) == E2BProvider.MAX_IDLE
+
+    run(scenario())
+    assert len(FakeSandbox.created) == E2BProvider.MAX_IDLE
+    assert provider.prewarm(50) == E2BProvider.MAX_IDLE
+
+
+def test_failed_creation_releases_its_slot():
+    provider = E2BProvider(api_key="k")
+    FakeSandbox.failures = 1
+
+    assert run(provider.prewarm_async(2)) == 1
+    assert run(provider.prewarm_async(2)) == 2
+
+
+def test_acquire_hands_out_a_warm_sandbox_and_refills():
+    provider = E2BProvider(api_key="k", min_warm=1, sandbox_timeout=300)
+
+    async def scenario():
+        await provider.prewarm_async(1)
+        [warm] = FakeSandbox.created
+
+        first, second = await asyncio.gather(provider.acquire("s"), provider.acquire("s"))
+        assert first is second is warm
+        # The E2B timeout counts from creation, so it is reset on hand-out
+        assert warm.timeouts == [300, 300]
+
+        await provider._refills[TEMPLATE]
+        assert provider._pool_size(TEMPLATE) == 1
+        await provider.cleanup_all_async()
+
+    run(scenario())
+    assert len(FakeSandbox.created) == 2
+    assert set(FakeSandbox.killed) == set(FakeSandbox.created)
+
+
+def test_single_session_without_min_warm_boots_once():
+    provider = E2BProvider(api_key="k")
+
+    async def scenario():
+        await provider.acquire("s")
+        assert not provider._refills
+
+    run(scenario())
+    assert len(FakeSandbox.created) == 1
+
+
+def test_idle_warm_sandboxes_are_killed_instead_of_handed_out():
+    provider = E2BProvider(api_key="k", max_idle_sec=60)
+    provider.prewarm(1)
+    [stale] = FakeSandbox.created
+    provider._pool[TEMPLATE][0] = (time.monotonic() - 120, stale)
+
+    run(provider.acquire("s"))
+    assert FakeSandbox.killed == [stale]
+    assert provider.get_sandbox("s") is not stale
+
+
+def test_drain_kills_creations_that_finish_afterwards():
+    provider = E2BProvider(api_key="k")
+    FakeSandbox.gate = threading.Event()
+
+    async def scenario():
+        prewarm = asyncio.create_task(provider.prewarm_async(2))
+        await asyncio.sleep(0.01)  # Let both creations start
+        await provider.cleanup_all_async()
+
+        FakeSandbox.gate.set()
+        await prewarm
+        assert provider._pool_size(TEMPLATE) == 0
+        assert await provider.prewarm_async(1) == 0
+
+    run(scenario())
+    assert len(FakeSandbox.created) == 2
+    assert set(FakeSandbox.killed) == set(FakeSandbox.created)
@@ -0,0 +1,105 @@
+"""Tests for ToolExecutor deferred (background) execution."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("e2b_code_interpreter")
+
+from orchestrator.providers.e2b import E2BProvider  # noqa: E402
+from orchestrator.tools.base import BaseTool, function_schema  # noqa: E402
+from orchestrator.tools.executor import ToolExecutor  # noqa: E402
+
+
+class GatedTool(BaseTool):
+    """Deferred tool that finishes once its gate is opened."""
+
+    name = "gated"
+    description = "Waits for a gate"
+    SCHEMA = function_schema(name, description, {"type": "object", "properties": {}})
+    deferred = True
+
+    def __init__(self):
+        super().__init__()
+        self.gate = asyncio.Event()
+
+    async def execute(self, session_id: str, **kwargs):
+        await self.gate.wait()
+        return {"success": True, "value": 42}
+
+
+def make_executor(tmp_path):
+    executor = ToolExecutor(E2BProvider(api_key="k"), registry_path=str(tmp_path))
+    tool = GatedTool()
+    executor.register(tool)
+    return executor, tool
+
+
+def test_deferred_call_returns_handle_then_result(tmp_path):
+    async def scenario():
+        executor, tool = make_executor(tmp_path)
+        [started] = await executor.execute_many(
+            "s", [{"name": "gated", "arguments": {}}], allow_deferred=True
+        )
+        assert started["status"] == "pending"
+
+        tool.gate.set()
+        # The model collects the result through the await_tool tool
+        result = await executor.execute("s", "await_tool", {"handle": started["handle"]})
+        assert result == {"success": True, "value": 42}
+
+        again = await executor.await_tool(started["handle"])
+        assert not again["success"]
+        assert not executor._pending and not executor._results
+
+    asyncio.run(scenario())
+
+
+def test_deferred_tools_run_inline_unless_allowed(tmp_path):
+    async def scenario():
+        executor, tool = make_executor(tmp_path)
+        tool.gate.set()
+        [result] = await executor.execute_many("s", [{"name": "gated", "arguments": {}}])
+        assert result == {"success": True, "value": 42}
+
+    asyncio.run(scenario())
+
+
+def test_await_timeout_keeps_the_handle(tmp_path):
+    async def scenario():
+        executor, tool = make_executor(tmp_path)
+        started = await executor.execute_deferred("s", "gated", {})
+
+        pending = await executor.await_tool(started["handle"], timeout=0.01)
+        assert pending == {"handle": started["handle"], "status": "pending"}
+
+        tool.gate.set()
+        assert (await executor.await_tool(started["handle"], timeout=1))["value"] == 42
+
+    asyncio.run(scenario())
+
+
+def test_finished_tasks_leave_pending(tmp_path):
+    async def scenario():
+        executor, tool = make_executor(tmp_path)
+        started = await executor.execute_deferred("s", "gated", {})
+        tool.gate.set()
+        await asyncio.sleep(0.01)
+
+        assert not executor._pending
+        assert (await executor.await_tool(started["handle"]))["value"] == 42
+
+    asyncio.run(scenario())
+
+
+def test_cancel_deferred_stops_running_tasks(tmp_path):
+    async def scenario():
+        executor, _ = make_executor(tmp_path)
+        started = await executor.execute_deferred("s", "gated", {})
+        task = executor._pending[started["handle"]]
+
+        await executor.cancel_deferred()
+        assert task.cancelled()
+        assert not executor._pending
+        assert not (await executor.await_tool(started["handle"]))["success"]
+
+    asyncio.run(scenario())
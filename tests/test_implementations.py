@@ -0,0 +1,70 @@
+"""Tests for DataAnalysisTool helper bootstrapping."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("e2b_code_interpreter")
+
+from orchestrator.providers.e2b import E2BProvider  # noqa: E402
+from orchestrator.tools.implementations import DataAnalysisTool  # noqa: E402
+
+
+class ScriptedProvider(E2BProvider):
+    """Provider whose sandbox records code and loses helpers on restart_kernel()."""
+
+    def __init__(self):
+        super().__init__(api_key="k")
+        self.runs = []
+        self.defined = False
+
+    async def acquire(self, session_id, template=None):
+        return self.sandboxes.setdefault(
+            session_id, SimpleNamespace(sandbox_id="sb1", kill=lambda: None)
+        )
+
+    async def execute_code_async(self, session_id, code, language="python"):
+        self.runs.append(code)
+        if "def _analysis_summary" in code:
+            self.defined = True
+        elif not self.defined:
+            return {"success": False, "stdout": "", "stderr": "",
+                    "error": "NameError: name '_analysis_summary' is not defined"}
+        return {"success": True, "stdout": "ok", "stderr": "", "error": None}
+
+    def restart_kernel(self):
+        self.defined = False
+
+
+def bootstrapped_runs(provider):
+    return ["def _analysis_summary" in code for code in provider.runs]
+
+
+def test_helpers_are_sent_once_per_sandbox():
+    provider = ScriptedProvider()
+    tool = DataAnalysisTool(provider)
+
+    for _ in range(3):
+        assert asyncio.run(tool.execute("s", "/data.csv"))["success"]
+    assert bootstrapped_runs(provider) == [True, False, False]
+
+
+def test_lost_helpers_are_redefined_and_retried_once():
+    provider = ScriptedProvider()
+    tool = DataAnalysisTool(provider)
+    asyncio.run(tool.execute("s", "/data.csv"))
+
+    provider.restart_kernel()
+    result = asyncio.run(tool.execute("s", "/data.csv"))
+    assert result["success"]
+    assert bootstrapped_runs(provider) == [True, False, True]
+
+
+def test_closing_the_sandbox_forgets_it():
+    provider = ScriptedProvider()
+    tool = DataAnalysisTool(provider)
+    asyncio.run(tool.execute("s", "/data.csv"))
+    assert tool._bootstrapped == {"sb1"}
+
+    provider.close_sandbox("s")
+    assert not tool._bootstrapped
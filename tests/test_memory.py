@@ -0,0 +1,249 @@
+"""Tests for MemoryStore persistence (append-only log, replay, compaction)."""
+import asyncio
+
+import orjson
+import pytest
+
+from orchestrator.core.memory import MemoryStore
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def log_lines(store_dir):
+    return (store_dir / MemoryStore.LOG_FILE).read_bytes().splitlines()
+
+
+def test_set_and_delete_survive_reload(tmp_path):
+    store = MemoryStore(storage_dir=str(tmp_path))
+    run(store.set("a", {"x": 1}))
+    run(store.set("b", [1, 2]))
+    run(store.delete("a"))
+    store.close()
+
+    reloaded = MemoryStore(storage_dir=str(tmp_path))
+    assert run(reloaded.get("a")) is None
+    assert run(reloaded.get("b")) == [1, 2]
+    reloaded.close()
+
+
+def test_records_written_in_one_loop_iteration_are_batched(tmp_path):
+    store = MemoryStore(storage_dir=str(tmp_path))
+
+    async def write_many():
+        for i in range(10):
+            await store.set(f"k{i}", i)
+        # Nothing hits the file until the scheduled flush runs
+        assert log_lines(tmp_path) == []
+        await asyncio.sleep(0)
+
+    run(write_many())
+    assert len(log_lines(tmp_path)) == 10
+    store.close()
+
+
+def test_torn_tail_is_truncated_on_load(tmp_path):
+    (tmp_path / MemoryStore.LOG_FILE).write_bytes(b'{"k":"a","v":1}\n{"k":"b","v"')
+
+    store = MemoryStore(storage_dir=str(tmp_path))
+    assert run(store.get("a")) == 1
+    assert not run(store.exists("b"))
+    run(store.set("c", 3))
+    store.close()
+
+    assert log_lines(tmp_path) == [b'{"k":"a","v":1}', b'{"k":"c","v":3}']
+    reloaded = MemoryStore(storage_dir=str(tmp_path))
+    assert run(reloaded.get("c")) == 3
+    reloaded.close()
+
+
+def test_unterminated_final_record_is_discarded(tmp_path):
+    # A complete record missing its newline would glue onto the next append
+    (tmp_path / MemoryStore.LOG_FILE).write_bytes(b'{"k":"a","v":1}\n{"k":"b","v":2}')
+
+    store = MemoryStore(storage_dir=str(tmp_path))
+    assert not run(store.exists("b"))
+    run(store.set("c", 3))
+    store.close()
+
+    reloaded = MemoryStore(storage_dir=str(tmp_path))
+    assert run(reloaded.get("c")) == 3
+    reloaded.close()
+
+
+def test_corrupted_record_is_skipped(tmp_path):
+    (tmp_path / MemoryStore.LOG_FILE).write_bytes(
+        b'{"k":"a","v":1}\nnot json\n{"k":"b","v":2}\n'
+    )
+
+    store = MemoryStore(storage_dir=str(tmp_path))
+    assert run(store.get("a")) == 1
+    assert run(store.get("b")) == 2
+    store.close()
+
+
+def test_malformed_records_are_skipped(tmp_path):
+    # Valid JSON that is not a set/delete record must not stop the replay
+    (tmp_path / MemoryStore.LOG_FILE).write_bytes(
+        b'{"k":"a","v":1}\n[1,2]\n"dk"\n7\n{"v":2}\n{"k":"a"}\n{"k":"b","v":2}\n'
+    )
+
+    store = MemoryStore(storage_dir=str(tmp_path))
+    assert run(store.get("a")) == 1
+    assert run(store.get("b")) == 2
+    assert sorted(run(store.keys())) == ["a", "b"]
+    store.close()
+
+
+def test_compact_keeps_one_record_per_live_key(tmp_path):
+    store = MemoryStore(storage_dir=str(tmp_path))
+    for i in range(5):
+        run(store.set("a", i))
+    run(store.set("b", "x"))
+    run(store.delete("b"))
+    store.compact()
+    store.close()
+
+    assert [orjson.loads(line) for line in log_lines(tmp_path)] == [{"k": "a", "v": 4}]
+
+
+def test_log_compacts_automatically(tmp_path, monkeypatch):
+    monkeypatch.setattr(MemoryStore, "COMPACT_THRESHOLD", 10)
+    store = MemoryStore(storage_dir=str(tmp_path))
+    for i in range(25):
+        run(store.set("a", i))
+    store.close()
+
+    assert len(log_lines(tmp_path)) < 10
+    reloaded = MemoryStore(storage_dir=str(tmp_path))
+    assert run(reloaded.get("a")) == 24
+    reloaded.close()
+
+
+def test_second_store_on_same_directory_is_rejected(tmp_path):
+    store = MemoryStore(storage_dir=str(tmp_path))
+    with pytest.raises(RuntimeError):
+        MemoryStore(storage_dir=str(tmp_path))
+    store.close()
+
+    # Released on close
+    MemoryStore(storage_dir=str(tmp_path)).close()
+
+
+def test_shared_store_is_reused_per_directory(tmp_path):
+    store = MemoryStore.shared(str(tmp_path))
+    assert MemoryStore.shared(str(tmp_path / ".." / tmp_path.name)) is store
+    store.close()
+
+    # A closed store is replaced on the next call
+    reopened = MemoryStore.shared(str(tmp_path))
+    assert reopened is not store
+    reopened.close()
+
+
+def test_legacy_json_files_are_migrated(tmp_path):
+    (tmp_path / "session_1.json").write_bytes(b'{"messages": []}')
+
+    store = MemoryStore(storage_dir=str(tmp_path))
+    assert run(store.get("session:1")) == {"messages": []}
+    assert not list(tmp_path.glob("*.json"))
+    store.close()
+
+    reloaded = MemoryStore(storage_dir=str(tmp_path))
+    assert run(reloaded.get("session:1")) == {"messages": []}
+    reloaded.close()
+
+
+def test_version_changes_on_every_write(tmp_path):
+    store = MemoryStore(storage_dir=str(tmp_path))
+    run(store.set("a", 1))
+    store.close()
+
+    store = MemoryStore(storage_dir=str(tmp_path))
+    assert store.version("a") == 0  # Loaded, not written since
+    run(store.set("a", 1))
+    first = store.version("a")
+    assert first not in (0, -1)
+    run(store.delete("a"))
+    assert store.version("a") == -1
+    run(store.set("a", 2))
+    assert store.version("a") not in (0, -1, first)
+    run(store.clear())
+    assert store.version("a") == -1
+    store.close()
+
+
+def test_ttl_expiry(tmp_path):
+    store = MemoryStore(storage_dir=None)
+
+    async def scenario():
+        await store.set("short", 1, ttl_seconds=0.01)
+        await store.set("long", 2, ttl_seconds=60)
+        await asyncio.sleep(0.02)
+        assert await store.get("short") is None
+        assert await store.keys() == ["long"]
+
+    run(scenario())
+
+
+def test_failed_compaction_keeps_pending_records(tmp_path):
+    store = MemoryStore(storage_dir=str(tmp_path))
+    store.cache["huge"] = 2 ** 70  # orjson cannot encode ints above 64 bits
+
+    async def write_and_compact():
+        await store.set("a", 1)
+        with pytest.raises(TypeError):
+            store.compact()
+        assert store._pending
+        await asyncio.sleep(0)
+
+    run(write_and_compact())
+    assert not (tmp_path / "memory.tmp").exists()
+    store.close()
+
+    reloaded = MemoryStore(storage_dir=str(tmp_path))
+    assert run(reloaded.get("a")) == 1
+    reloaded.close()
+
+
+def test_failed_auto_compaction_is_not_retried_every_append(tmp_path, monkeypatch):
+    monkeypatch.setattr(MemoryStore, "COMPACT_THRESHOLD", 5)
+    store = MemoryStore(storage_dir=str(tmp_path))
+    store.cache["huge"] = 2 ** 70
+    attempts = []
+    compact = store.compact
+    monkeypatch.setattr(store, "compact", lambda: attempts.append(1) or compact())
+
+    for i in range(9):
+        run(store.set("a", i))
+    store.close()
+
+    assert len(attempts) == 1
+    reloaded = MemoryStore(storage_dir=str(tmp_path))
+    assert run(reloaded.get("a")) == 8
+    reloaded.close()
+
+
+def test_scheduled_flush_errors_are_logged(tmp_path, caplog):
+    store = MemoryStore(storage_dir=str(tmp_path))
+    store.logger.propagate = True
+
+    async def write_to_closed_log():
+        await store.set("a", 1)
+        store._log.close()
+        await asyncio.sleep(0)
+
+    run(write_to_closed_log())
+    assert "Failed to flush memory log" in caplog.text
+    store._log = None
+    store.close()
+
+
+def test_clear_after_close(tmp_path):
+    store = MemoryStore(storage_dir=str(tmp_path))
+    run(store.set("a", 1))
+    store.close()
+
+    run(store.clear())
+    assert run(store.keys()) == []